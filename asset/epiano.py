@@ -7,6 +7,8 @@ from components.filter import Filter
 from components.envelope_generator import EnvelopeGenerator
 from components.fxprocessor import FXProcessor
 from components.modulator import Modulator
+from components.fm_synth import FMSynth
+from components.voice_pool import VoicePool
 
 class EPianoNote:
     """Single note for E-Piano"""
@@ -33,6 +35,47 @@ class EPianoNote:
         self.fx = FXProcessor(self.sample_rate)
         self.fx.add_effect('tremolo', depth=0.5, rate=5.0, sample_rate=self.sample_rate)
         self.fx.add_effect('reverb', decay=0.3, room_size=0.5, sample_rate=self.sample_rate)
+
+class EPiano:
+    """Polyphonic FM E-Piano, voices share one FX chain"""
+    def __init__(self, sample_rate=44100, max_polyphony=16, parallel=False, num_workers=None):
+        """
+        Initialize EPiano
+        
+        params:
+        - sample_rate (int): sample rate
+        - max_polyphony (int): number of voices
+        - parallel (bool): render voices on several cores
+        - num_workers (int): number of worker threads in parallel mode, defaults to the number of cores
+        """
+        self.sample_rate = sample_rate
+        self.voices = VoicePool(self._create_voice, max_polyphony=max_polyphony, parallel=parallel, num_workers=num_workers)
+        
+        self.fx = FXProcessor(self.sample_rate)
+        self.fx.add_effect('tremolo', depth=0.5, rate=5.0, sample_rate=self.sample_rate)
+        self.fx.add_effect('reverb', decay=0.3, room_size=0.5, sample_rate=self.sample_rate)
+        
+    def _create_voice(self) -> FMSynth:
+        voice = FMSynth(num_operators=4, sample_rate=self.sample_rate)
+        voice.load_preset('epiano')
+        return voice
+        
+    def note_on(self, note: int, velocity=1.0):
+        self.voices.note_on(note, velocity)
         
+    def note_off(self, note: int):
+        self.voices.note_off(note)
         
-        
\ No newline at end of file
+    def generate_audio(self, duration: float) -> np.ndarray:
+        """
+        Render the next block of all voices through the FX chain
+        
+        params:
+        - duration (float): block duration (s)
+        
+        return:
+        - np.ndarray: audio block of round(duration * sample_rate) samples
+        """
+        num_samples = int(round(duration * self.sample_rate))
+        return self.fx.process(self.voices.render(num_samples))
+
@@ -3,6 +3,60 @@
 import numpy as np
 from numba import jit
 
+# stages of the block-rendering envelope state
+_STAGE_IDLE = 0
+_STAGE_ATTACK = 1
+_STAGE_DECAY = 2
+_STAGE_SUSTAIN = 3
+_STAGE_RELEASE = 4
+
+@jit(nopython=True)
+def _segment_value(start, end, position, length, geometric):
+    p = position / length
+    if geometric:
+        start = max(start, 1e-6)
+        end = max(end, 1e-6)
+        return start * (end / start) ** p - 1e-6
+    return start + (end - start) * p
+
+@jit(nopython=True)
+def _envelope_step(state, params):
+    """
+    Advance the envelope by one sample
+    
+    state = [stage, position, segment start level, current level]
+    params = [attack samples, decay samples, sustain level, release samples, geometric]
+    """
+    while True:
+        stage = int(state[0])
+        if stage == _STAGE_ATTACK:
+            length, target, next_stage = params[0], 1.0, _STAGE_DECAY
+        elif stage == _STAGE_DECAY:
+            length, target, next_stage = params[1], params[2], _STAGE_SUSTAIN
+        elif stage == _STAGE_RELEASE:
+            length, target, next_stage = params[3], 0.0, _STAGE_IDLE
+        elif stage == _STAGE_SUSTAIN:
+            state[3] = params[2]
+            return state[3]
+        else:
+            state[3] = 0.0
+            return 0.0
+        
+        if state[1] < length:
+            state[3] = _segment_value(state[2], target, state[1], length, params[4] != 0.0)
+            state[1] += 1.0
+            return state[3]
+        
+        state[0] = next_stage
+        state[1] = 0.0
+        state[2] = target
+
+@jit(nopython=True)
+def _render_envelope(out: np.ndarray, state: np.ndarray, params: np.ndarray) -> np.ndarray:
+    for i in range(len(out)):
+        out[i] = _envelope_step(state, params)
+    return out
+
 class EnvelopeGenerator:
     """Generate ADSR envelope"""
     def __init__(self, attack=0.01, decay=0.1, sustain_level=0.7, release=0.2, sample_rate=44100, curve='lin'):
@@ -29,6 +83,10 @@ class EnvelopeGenerator:
         self.decay_samples = int(self.decay * sample_rate)
         self.release_samples = int(self.release * sample_rate)
         
+        # [stage, position, segment start level, current level], see `render`
+        self.state = np.zeros(4)
+        self._segments = None
+        
     def set_paramters(self, attack=None, decay=None, sustain_level=None, release=None, curve='None'):
         if attack is not None:
             self.attack = attack
@@ -43,6 +101,7 @@ class EnvelopeGenerator:
             self.release_samples = int(self.release * self.sample_rate)
         if curve is not None:
             self.curve = curve.lower()
+        self._segments = None
             
     @staticmethod
     @jit(nopython=True)
@@ -56,20 +115,29 @@ class EnvelopeGenerator:
         else:
             raise ValueError(f'Unsupported curve type: {curve}')
         
+    def segments(self) -> dict:
+        """Attack, decay and release curves used by `generate`, computed once per parameter set"""
+        if self._segments is None:
+            self._segments = {
+                'attack': self._generate_curve(0, 1, self.attack_samples, self.curve) if self.attack_samples > 0 else np.zeros(0),
+                'decay': self._generate_curve(1, self.sustain_level, self.decay_samples, self.curve) if self.decay_samples > 0 else np.zeros(0),
+                'release': self._generate_curve(self.sustain_level, 0, self.release_samples, self.curve) if self.release_samples > 0 else np.zeros(0),
+            }
+        return self._segments
+    
     def generate(self, duration: float, trigger_on=True) -> np.ndarray:
         num_samples = int(duration * self.sample_rate)
         envelope = np.zeros(num_samples)
+        segments = self.segments()
         
         if trigger_on:
             if self.attack_samples > 0:
-                attack_signal = self._generate_curve(0, 1, self.attack_samples, self.curve)
-                envelope[:self.attack_samples] = attack_signal
+                envelope[:self.attack_samples] = segments['attack'][:num_samples]
                 
             if self.decay_samples > 0:
                 start = self.attack_samples
                 end = start + self.decay_samples
-                decay_signal = self._generate_curve(1, self.sustain_level, self.decay_samples, self.curve)
-                envelope[start : end] = decay_signal
+                envelope[start : end] = segments['decay'][:max(0, num_samples - start)]
                 
             sustain_start = self.attack_samples + self.decay_samples
             sustain_end = num_samples
@@ -77,8 +145,46 @@ class EnvelopeGenerator:
         
         else:
             if self.release_samples > 0:
-                release_signal = self._generate_curve(self.sustain_level, 0, self.release_samples, self.curve)
                 end = min(num_samples, self.release_samples)
-                envelope[: end] = release_signal
+                envelope[: end] = segments['release'][:end]
         
-        return envelope[:-1]
\ No newline at end of file
+        return envelope[:-1]
+    
+    def block_params(self) -> np.ndarray:
+        """Envelope parameters packed for the compiled block kernels"""
+        if self.curve not in ['lin', 'exp', 'log']:
+            raise ValueError(f'Unsupported curve type: {self.curve}')
+        geometric = 0.0 if self.curve == 'lin' else 1.0
+        return np.array([self.attack_samples, self.decay_samples, self.sustain_level, self.release_samples, geometric], dtype=np.float64)
+    
+    def note_on(self):
+        """Start the attack stage, from the current level"""
+        self.state[0] = _STAGE_ATTACK
+        self.state[1] = 0.0
+        self.state[2] = self.state[3]
+        
+    def note_off(self):
+        """Start the release stage, from the current level"""
+        if self.state[0] != _STAGE_IDLE:
+            self.state[0] = _STAGE_RELEASE
+            self.state[1] = 0.0
+            self.state[2] = self.state[3]
+        
+    def is_idle(self) -> bool:
+        """Whether the release has finished, or no note was started"""
+        return self.state[0] == _STAGE_IDLE
+        
+    def render(self, num_samples: int, out=None) -> np.ndarray:
+        """
+        Render the next block of the envelope, keeping state between blocks
+        
+        params:
+        - num_samples (int): block length
+        - out (np.ndarray): optional output buffer of length `num_samples`
+        
+        return:
+        - np.ndarray: envelope block
+        """
+        if out is None:
+            out = np.zeros(num_samples)
+        return _render_envelope(out[:num_samples], self.state, self.block_params())
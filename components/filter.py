@@ -5,11 +5,20 @@ import numpy as np
 from scipy.signal import butter
 from numba import jit
 
+# states below this are flushed to zero, so decaying tails never reach denormal numbers
+_DENORMAL = 1e-30
+
 @jit(nopython=True)
 def _filter_step(x, b, a, zi):
     y = b[0] * x + zi[0]
-    for i in range(1, len(b)):
-        zi[i - 1] = b[i] * x + zi[i] - a[i] * y
+    n = len(b)
+    for i in range(1, n):
+        if i < n - 1:
+            zi[i - 1] = b[i] * x + zi[i] - a[i] * y
+        else:
+            zi[i - 1] = b[i] * x - a[i] * y
+        if abs(zi[i - 1]) < _DENORMAL:
+            zi[i - 1] = 0.0
     return y, zi
         
 @jit(nopython=True)
@@ -22,9 +31,86 @@ def _apply_filter(signal: np.ndarray, b, a, zi: np.ndarray) -> tuple[np.ndarray,
         
     return filtered_signal, zi
 
+@jit(nopython=True)
+def _butter_coefficients(cutoff: float, order: int, sample_rate: float, highpass: bool, b: np.ndarray, a: np.ndarray):
+    # Butterworth lowpass / highpass by bilinear transform with prewarping, same result as scipy `butter`.
+    # Built as first / second order sections, multiplied out into b and a of length order + 1
+    k = np.tan(np.pi * cutoff / sample_rate)
+    b[:] = 0.0
+    a[:] = 0.0
+    b[0] = 1.0
+    a[0] = 1.0
+    length = 1
+    
+    for section in range(order // 2):
+        q = 1.0 / (2.0 * np.sin(np.pi * (2 * section + 1) / (2 * order)))
+        norm = 1.0 / (1.0 + k / q + k * k)
+        if highpass:
+            sb0, sb1, sb2 = norm, -2.0 * norm, norm
+        else:
+            sb0, sb1, sb2 = k * k * norm, 2.0 * k * k * norm, k * k * norm
+        sa1 = 2.0 * (k * k - 1.0) * norm
+        sa2 = (1.0 - k / q + k * k) * norm
+        for i in range(length + 1, -1, -1):
+            nb = sb0 * b[i]
+            na = a[i]
+            if i >= 1:
+                nb += sb1 * b[i - 1]
+                na += sa1 * a[i - 1]
+            if i >= 2:
+                nb += sb2 * b[i - 2]
+                na += sa2 * a[i - 2]
+            b[i] = nb
+            a[i] = na
+        length += 2
+        
+    if order % 2 == 1:
+        norm = 1.0 / (1.0 + k)
+        if highpass:
+            sb0, sb1 = norm, -norm
+        else:
+            sb0, sb1 = k * norm, k * norm
+        sa1 = (k - 1.0) * norm
+        for i in range(length, -1, -1):
+            nb = sb0 * b[i]
+            na = a[i]
+            if i >= 1:
+                nb += sb1 * b[i - 1]
+                na += sa1 * a[i - 1]
+            b[i] = nb
+            a[i] = na
+
+@jit(nopython=True)
+def _apply_filter_modulated(signal: np.ndarray, cutoff: np.ndarray, order: int, sample_rate: float, highpass: bool, control_period: int, zi: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    # coefficients are designed at every control point and linearly interpolated in between
+    num_samples = len(signal)
+    filtered_signal = np.zeros_like(signal)
+    zi = zi.copy()
+    b0 = np.zeros(order + 1)
+    a0 = np.zeros(order + 1)
+    b1 = np.zeros(order + 1)
+    a1 = np.zeros(order + 1)
+    b = np.zeros(order + 1)
+    a = np.zeros(order + 1)
+    _butter_coefficients(cutoff[0], order, sample_rate, highpass, b1, a1)
+    
+    for start in range(0, num_samples, control_period):
+        length = min(control_period, num_samples - start)
+        b0[:] = b1
+        a0[:] = a1
+        _butter_coefficients(cutoff[min(start + control_period, num_samples - 1)], order, sample_rate, highpass, b1, a1)
+        for i in range(start, start + length):
+            frac = (i - start) / length
+            for k in range(order + 1):
+                b[k] = b0[k] + (b1[k] - b0[k]) * frac
+                a[k] = a0[k] + (a1[k] - a0[k]) * frac
+            filtered_signal[i], zi = _filter_step(signal[i], b, a, zi)
+            
+    return filtered_signal, zi, b1, a1
+
 class Filter:
     """Filter class, for design and apply filter to signal"""
-    def __init__(self, filter_type='lowpass', cutoff=1000.0, order=4, sample_rate=44100, bandwidth=None):
+    def __init__(self, filter_type='lowpass', cutoff=1000.0, order=4, sample_rate=44100, bandwidth=None, silence_threshold=1e-8, coefficients=None):
         """
         Initialize filter
         
@@ -36,41 +122,54 @@ class Filter:
         - order (int): order of filter
         - sample_rate (int): sample rate
         - bandwidth (float): only used in some of the filters
+        - silence_threshold (float): input and state below this count as silent, the filter is then bypassed
+        - coefficients (tuple): precomputed (b, a) for these settings, skips the design
         """
         self.filter_type = filter_type.lower()
         self.cutoff = cutoff
         self.order = order
         self.sample_rate = sample_rate
         self.bandwidth = bandwidth
+        self.silence_threshold = silence_threshold
         
         self.b = None
         self.a = None
         self.zi = None
         
-        self._design_filter()
+        if coefficients is not None:
+            self.b, self.a = np.asarray(coefficients[0]), np.asarray(coefficients[1])
+            self.reset()
+        else:
+            self._design_filter()
         
-    def _design_filter(self):
+    def _coefficients(self, cutoff):
         nyquist = 0.5 * self.sample_rate
         
         if self.filter_type in ['lowpass', 'highpass']:
-            normal_cutoff = self.cutoff / nyquist
-            self.b, self.a = butter(self.order, normal_cutoff, btype=self.filter_type, analog=False)
+            normal_cutoff = cutoff / nyquist
+            return butter(self.order, normal_cutoff, btype=self.filter_type, analog=False)
         elif self.filter_type in ['bandpass', 'bandstop']:
-            if isinstance(self.cutoff, (list, tuple)) and len(self.cutoff) == 2:
-                low = self.cutoff[0] / nyquist
-                high = self.cutoff[1] / nyquist
-                self.b, self.a = butter(self.order, [low, high], btype=self.filter_type, analog=False)
+            if isinstance(cutoff, (list, tuple)) and len(cutoff) == 2:
+                low = cutoff[0] / nyquist
+                high = cutoff[1] / nyquist
+                return butter(self.order, [low, high], btype=self.filter_type, analog=False)
             else:
                 raise ValueError("Cutoff must be a tuple for bandpass filter and bandstop filter")
         else:
             raise ValueError(f"Unsupported filter type: {self.filter_type}")
         
+    def _design_filter(self):
+        self.b, self.a = self._coefficients(self.cutoff)
         self.zi = np.zeros(max(len(self.a), len(self.b)) - 1)
         
     def reset(self):
         """Clear filter states, reset"""
         self.zi = np.zeros(max(len(self.a), len(self.b)) - 1)
         
+    def is_silent(self) -> bool:
+        """Whether the internal state has decayed below the silence threshold"""
+        return np.max(np.abs(self.zi), initial=0.0) < self.silence_threshold
+        
     def set_cutoff(self, cutoff: int | tuple):
         """Set cutoff frequency"""
         self.cutoff = cutoff
@@ -89,17 +188,32 @@ class Filter:
         self._design_filter()
         self.reset()
         
-    def apply(self, signal: np.ndarray) -> np.ndarray:
+    def apply(self, signal: np.ndarray, cutoff=None, control_period=32) -> np.ndarray:
         """
         Apply filter, filter the signal
         
         params:
         - signal (np.ndarray): input signal
+        - cutoff (np.ndarray): optional per-sample cutoff frequency (Hz), only for lowpass filter and highpass filter
+        - control_period (int): samples between coefficient updates when `cutoff` is given
         
         return:
         - np.ndarray: filtered signal
         """
-        filtered_signal, self.zi = _apply_filter(signal, self.b, self.a, self.zi)
+        if self.is_silent() and np.max(np.abs(signal), initial=0.0) < self.silence_threshold:
+            # nothing rings and nothing comes in: skip the recursion until new input arrives
+            self.zi[:] = 0.0
+            return np.zeros_like(signal)
+        
+        if cutoff is None:
+            filtered_signal, self.zi = _apply_filter(signal, self.b, self.a, self.zi)
+            return filtered_signal
+        
+        if self.filter_type not in ['lowpass', 'highpass']:
+            raise ValueError(f"Cutoff modulation is not supported for {self.filter_type} filter")
+        
+        filtered_signal, self.zi, self.b, self.a = _apply_filter_modulated(signal, cutoff, self.order, float(self.sample_rate), self.filter_type == 'highpass', control_period, self.zi)
+        self.cutoff = cutoff[len(signal) - 1]
         return filtered_signal
     
  
@@ -0,0 +1,231 @@
+# fm_synth.py
+
+import numpy as np
+from numba import jit
+
+from components.envelope_generator import EnvelopeGenerator, _envelope_step
+
+def _chain(start: int, stop: int) -> list:
+    # operators start..stop - 1 in series, each modulating the one below
+    return [(k + 1, k) for k in range(start, stop - 1)]
+
+# routing algorithms for n operators: n -> (modulation edges as (modulator, target), carriers)
+# a modulator must have a higher index than its target, operators are rendered from the last to the first
+ALGORITHMS = {
+    # one chain, the last operator modulates down to carrier 0
+    'stack': lambda n: (_chain(0, n), [0]),
+    # two chains over the lower and upper half of the operators
+    'two_stacks': lambda n: (_chain(0, n // 2) + _chain(n // 2, n), [0, n // 2] if n > 1 else [0]),
+    # operator 1 modulates the carrier, every higher operator modulates operator 1
+    'branch': lambda n: ([(k, 1) for k in range(n - 1, 1, -1)] + [(1, 0)] * (n > 1), [0]),
+    # every other operator modulates carrier 0
+    'three_to_one': lambda n: ([(k, 0) for k in range(n - 1, 0, -1)], [0]),
+    # the last operator modulates every other operator, all of them carriers
+    'one_to_three': lambda n: ([(n - 1, k) for k in range(n - 1)], list(range(max(n - 1, 1)))),
+    'parallel': lambda n: ([], list(range(n))),
+    # pairs of modulator and carrier
+    'three_stacks': lambda n: ([(k + 1, k) for k in range(0, n - 1, 2)], list(range(0, n, 2))),
+}
+
+# operator settings: ratio, level, feedback, detune, envelope times
+PRESETS = {
+    'epiano': {
+        'algorithm': 'two_stacks',
+        'operators': [
+            {'ratio': 1.0, 'level': 1.0, 'attack': 0.001, 'decay': 1.5, 'sustain_level': 0.3, 'release': 0.4},
+            {'ratio': 14.0, 'level': 1.2, 'attack': 0.001, 'decay': 0.3, 'sustain_level': 0.0, 'release': 0.2},
+            {'ratio': 1.0, 'level': 0.6, 'detune': 1.5, 'attack': 0.001, 'decay': 2.0, 'sustain_level': 0.4, 'release': 0.5},
+            {'ratio': 1.0, 'level': 1.8, 'feedback': 0.3, 'attack': 0.001, 'decay': 1.0, 'sustain_level': 0.2, 'release': 0.4},
+        ],
+    },
+    'bell': {
+        'algorithm': 'two_stacks',
+        'operators': [
+            {'ratio': 1.0, 'level': 1.0, 'attack': 0.001, 'decay': 4.0, 'sustain_level': 0.0, 'release': 2.0},
+            {'ratio': 3.5, 'level': 3.0, 'attack': 0.001, 'decay': 3.0, 'sustain_level': 0.0, 'release': 2.0},
+            {'ratio': 2.0, 'level': 0.5, 'attack': 0.001, 'decay': 2.5, 'sustain_level': 0.0, 'release': 1.5},
+            {'ratio': 5.19, 'level': 2.0, 'attack': 0.001, 'decay': 1.5, 'sustain_level': 0.0, 'release': 1.0},
+        ],
+    },
+}
+
+@jit(nopython=True, nogil=True)
+def _render_fm(out, phases, sample_rate, frequency, freq_step, ratios, detunes, levels, feedback, fb_history, mod_matrix, carriers, env_states, env_params, amplitude, amp_step):
+    # frequency and amplitude are per-sample arrays, a step of 0 holds their first value
+    num_ops = len(phases)
+    op_out = np.zeros(num_ops)
+    
+    for i in range(len(out)):
+        sample = 0.0
+        f = frequency[i * freq_step]
+        for k in range(num_ops - 1, -1, -1):
+            mod = feedback[k] * 0.5 * (fb_history[k, 0] + fb_history[k, 1])
+            for j in range(k + 1, num_ops):
+                mod += mod_matrix[k, j] * op_out[j]
+                
+            env = _envelope_step(env_states[k], env_params[k])
+            value = levels[k] * env * np.sin(2 * np.pi * phases[k] + mod)
+            
+            fb_history[k, 1] = fb_history[k, 0]
+            fb_history[k, 0] = value
+            op_out[k] = value
+            sample += carriers[k] * value
+            
+            phases[k] += (f * ratios[k] + detunes[k]) / sample_rate
+            if phases[k] >= 1.0:
+                phases[k] -= np.floor(phases[k])
+        out[i] = amplitude[i * amp_step] * sample
+        
+    return out
+
+class FMOperator:
+    """Single FM operator: a sine at `ratio` times the note frequency with its own envelope"""
+    def __init__(self, ratio=1.0, level=1.0, feedback=0.0, detune=0.0, envelope=None):
+        """
+        Initialize FMOperator
+        
+        params:
+        - ratio (float): frequency ratio to the note frequency
+        - level (float): output level, for a modulator it is the modulation index (rad)
+        - feedback (float): self feedback amount (rad)
+        - detune (float): frequency offset (Hz)
+        - envelope (EnvelopeGenerator): envelope of the operator level
+        """
+        self.ratio = ratio
+        self.level = level
+        self.feedback = feedback
+        self.detune = detune
+        self.envelope = envelope
+
+class FMSynth:
+    """Multi-operator FM voice, rendered in blocks by a phase-accumulator kernel"""
+    def __init__(self, num_operators=4, algorithm='stack', sample_rate=44100):
+        """
+        Initialize FMSynth
+        
+        params:
+        - num_operators (int): number of operators
+        - algorithm (str | tuple): name in ALGORITHMS, built for `num_operators`, or (edges, carriers) with edges as (modulator, target) pairs
+        - sample_rate (int): sample rate
+        """
+        self.num_operators = num_operators
+        self.sample_rate = sample_rate
+        self.frequency = 440.0
+        self.velocity = 1.0
+        
+        self.operators = [FMOperator(envelope=EnvelopeGenerator(sample_rate=sample_rate)) for _ in range(num_operators)]
+        
+        self.phases = np.zeros(num_operators)
+        self.fb_history = np.zeros((num_operators, 2))
+        
+        self.set_algorithm(algorithm)
+        
+    def set_algorithm(self, algorithm, num_operators=None):
+        """
+        Set routing algorithm, by name or as (edges, carriers)
+        
+        params:
+        - algorithm (str | tuple): name in ALGORITHMS or (edges, carriers)
+        - num_operators (int): operators a named algorithm is built for, defaults to all of them, the rest stay unrouted
+        """
+        if isinstance(algorithm, str):
+            if algorithm not in ALGORITHMS:
+                raise ValueError(f'Unsupported algorithm: {algorithm}')
+            edges, carriers = ALGORITHMS[algorithm](num_operators or self.num_operators)
+        else:
+            edges, carriers = algorithm
+            
+        mod_matrix = np.zeros((self.num_operators, self.num_operators))
+        for modulator, target in edges:
+            if not 0 <= target < modulator < self.num_operators:
+                raise ValueError(f'Invalid modulation edge: {modulator} -> {target}')
+            mod_matrix[target, modulator] = 1.0
+            
+        carrier_mask = np.zeros(self.num_operators)
+        for carrier in carriers:
+            if not 0 <= carrier < self.num_operators:
+                raise ValueError(f'Invalid carrier: {carrier}')
+            carrier_mask[carrier] = 1.0
+            
+        self.algorithm = algorithm
+        self.mod_matrix = mod_matrix
+        self.carriers = carrier_mask
+        
+    def set_operator(self, index: int, ratio=None, level=None, feedback=None, detune=None, attack=None, decay=None, sustain_level=None, release=None, curve=None):
+        """Set parameters of an operator and its envelope"""
+        if index < 0 or index >= self.num_operators:
+            raise IndexError("Invalid operator index")
+        op = self.operators[index]
+        if ratio is not None:
+            op.ratio = ratio
+        if level is not None:
+            op.level = level
+        if feedback is not None:
+            op.feedback = feedback
+        if detune is not None:
+            op.detune = detune
+        op.envelope.set_paramters(attack=attack, decay=decay, sustain_level=sustain_level, release=release, curve=curve if curve is not None else op.envelope.curve)
+        
+    def load_preset(self, name: str):
+        """Load a preset from PRESETS"""
+        if name not in PRESETS:
+            raise ValueError(f'Unsupported preset: {name}')
+        preset = PRESETS[name]
+        if len(preset['operators']) > self.num_operators:
+            raise ValueError(f'Preset {name} needs {len(preset["operators"])} operators')
+        self.set_algorithm(preset['algorithm'], num_operators=len(preset['operators']))
+        for index, params in enumerate(preset['operators']):
+            self.set_operator(index, **params)
+            
+    def note_on(self, frequency: float, velocity=1.0):
+        """Start a note, phases restart so every note has the same attack"""
+        self.frequency = frequency
+        self.velocity = velocity
+        self.phases[:] = 0.0
+        self.fb_history[:] = 0.0
+        for op in self.operators:
+            op.envelope.note_on()
+            
+    def note_off(self):
+        """Release the note"""
+        for op in self.operators:
+            op.envelope.note_off()
+            
+    def is_idle(self) -> bool:
+        """Whether the envelopes of all carriers have finished"""
+        return all(op.envelope.is_idle() for op, carrier in zip(self.operators, self.carriers) if carrier)
+        
+    def render(self, num_samples: int, out=None, frequency=None, amplitude=None) -> np.ndarray:
+        """
+        Render the next block of the voice
+        
+        params:
+        - num_samples (int): block length
+        - out (np.ndarray): optional output buffer of length `num_samples`
+        - frequency (np.ndarray): optional per-sample note frequency (Hz), overrides the note_on frequency
+        - amplitude (np.ndarray): optional per-sample amplitude, overrides the note_on velocity
+        
+        return:
+        - np.ndarray: rendered block
+        """
+        if out is None:
+            out = np.zeros(num_samples)
+            
+        freq, freq_step = (frequency, 1) if frequency is not None else (np.array([self.frequency], dtype=np.float64), 0)
+        amp, amp_step = (amplitude, 1) if amplitude is not None else (np.array([self.velocity], dtype=np.float64), 0)
+        
+        ops = self.operators
+        ratios = np.array([op.ratio for op in ops], dtype=np.float64)
+        detunes = np.array([op.detune for op in ops], dtype=np.float64)
+        levels = np.array([op.level for op in ops], dtype=np.float64)
+        feedback = np.array([op.feedback for op in ops], dtype=np.float64)
+        env_states = np.array([op.envelope.state for op in ops])
+        env_params = np.array([op.envelope.block_params() for op in ops])
+        
+        _render_fm(out[:num_samples], self.phases, self.sample_rate, freq, freq_step, ratios, detunes, levels, feedback,
+                   self.fb_history, self.mod_matrix, self.carriers, env_states, env_params, amp, amp_step)
+        
+        for k, op in enumerate(ops):
+            op.envelope.state[:] = env_states[k]
+            
+        return out[:num_samples]
@@ -3,18 +3,33 @@
 import numpy as np
 from numba import jit
 
+# feedback samples below this are flushed to zero, so decaying tails never reach denormal numbers
+_DENORMAL = 1e-30
+
+# effect parameters that accept a per-sample array in `FXProcessor.process`
+MODULATABLE_PARAMS = {
+    'reverb': ('decay',),
+    'delay': ('feedback', 'mix'),
+    'chorus': ('depth', 'rate', 'mix'),
+    'tremolo': ('depth', 'rate'),
+}
+
 class FXProcessor:
     """Multi-purpose effctor"""
-    def __init__(self, sample_rate=44100):
+    def __init__(self, sample_rate=44100, silence_threshold=1e-8):
         """
         Initialize FXProcessor
         
         params:
         - sample_rate (int): sample rate
+        - silence_threshold (float): the chain is bypassed while the input block and every feedback line peak below this
         """
         
         self.sample_rate = sample_rate
+        self.silence_threshold = silence_threshold
         self.effects = []
+        # reverb / delay feedback lines by effect index: (line, write position), kept across blocks
+        self.lines = {}
         
     def add_effect(self, effect, **kwargs):
         """
@@ -39,27 +54,56 @@ class FXProcessor:
     def clear_effects(self):
         """Reset effect chain"""
         self.effects = []
+        self.lines = {}
+        
+    def reset(self):
+        """Clear the reverb and delay lines"""
+        self.lines = {}
+        
+    def is_silent(self) -> bool:
+        """Whether every reverb / delay line has decayed below the silence threshold"""
+        return all(np.max(np.abs(line)) < self.silence_threshold for line, _ in self.lines.values())
+        
+    def _line(self, index: int, effect: str, params: dict) -> tuple[np.ndarray, np.ndarray, dict]:
+        # feedback line of a reverb / delay effect and the remaining kernel params
+        params = dict(params)
+        delay_time = params.pop('room_size' if effect == 'reverb' else 'delay_time', 0.5 if effect == 'reverb' else 0.3)
+        sample_rate = params.pop('sample_rate', 44100)
+        delay_samples = max(int(delay_time * sample_rate), 1)
+        if index not in self.lines or len(self.lines[index][0]) != delay_samples:
+            self.lines[index] = (np.zeros(delay_samples), np.zeros(1, dtype=np.int64))
+        line, position = self.lines[index]
+        return line, position, params
     
     @staticmethod
     @jit(nopython=True)
-    def _apply_reverb(signal: np.ndarray, decay=0.5, room_size=0.5, sample_rate=44100) -> np.ndarray:
-        delay_samples = int(room_size * sample_rate)
+    def _apply_reverb(signal: np.ndarray, line: np.ndarray, position: np.ndarray, decay=0.5) -> np.ndarray:
+        # `line` holds the last len(line) outputs as a ring buffer, `position` is its write index
         output = np.zeros(len(signal))
+        p = position[0]
         for i in range(len(signal)):
-            output[i] = signal[i]
-            if i >= delay_samples:
-                output[i] += decay * output[i - delay_samples]
+            output[i] = signal[i] + decay * line[p]
+            if abs(output[i]) < _DENORMAL:
+                output[i] = 0.0
+            line[p] = output[i]
+            p = p + 1 if p + 1 < len(line) else 0
+        position[0] = p
         return output
     
     @staticmethod
     @jit(nopython=True)
-    def _apply_delay(signal: np.ndarray, delay_time=0.3, feedback=0.5, mix=0.5, sample_rate=44100) -> np.ndarray:
-        delay_samples = int(delay_time * sample_rate)
+    def _apply_delay(signal: np.ndarray, line: np.ndarray, position: np.ndarray, feedback=0.5, mix=0.5) -> np.ndarray:
         output = np.zeros(len(signal))
+        p = position[0]
         for i in range((len(signal))):
             dry_signal = signal[i]
-            wet_signal = feedback * output[i - delay_samples] if i >= delay_samples else 0
+            wet_signal = feedback * line[p]
             output[i] = (1.0 - mix) * dry_signal + mix * (dry_signal + wet_signal)
+            if abs(output[i]) < _DENORMAL:
+                output[i] = 0.0
+            line[p] = output[i]
+            p = p + 1 if p + 1 < len(line) else 0
+        position[0] = p
         return output
     
     @staticmethod
@@ -84,12 +128,112 @@ class FXProcessor:
         mod_signal = 1 - depth * (0.5 * (1 + np.sin(2 * np.pi * rate * t)))
         return signal * mod_signal
     
-    def process(self, signal: np.ndarray) -> np.ndarray:
-        for effect, params in self.effects:
-            if effect == 'reverb':
-                signal = self._apply_reverb(signal, **params)
+    @staticmethod
+    @jit(nopython=True)
+    def _apply_reverb_mod(signal: np.ndarray, line: np.ndarray, position: np.ndarray, decay: np.ndarray) -> np.ndarray:
+        output = np.zeros(len(signal))
+        p = position[0]
+        for i in range(len(signal)):
+            output[i] = signal[i] + decay[i] * line[p]
+            if abs(output[i]) < _DENORMAL:
+                output[i] = 0.0
+            line[p] = output[i]
+            p = p + 1 if p + 1 < len(line) else 0
+        position[0] = p
+        return output
+    
+    @staticmethod
+    @jit(nopython=True)
+    def _apply_delay_mod(signal: np.ndarray, line: np.ndarray, position: np.ndarray, feedback: np.ndarray, mix: np.ndarray) -> np.ndarray:
+        output = np.zeros(len(signal))
+        p = position[0]
+        for i in range((len(signal))):
+            dry_signal = signal[i]
+            wet_signal = feedback[i] * line[p]
+            output[i] = (1.0 - mix[i]) * dry_signal + mix[i] * (dry_signal + wet_signal)
+            if abs(output[i]) < _DENORMAL:
+                output[i] = 0.0
+            line[p] = output[i]
+            p = p + 1 if p + 1 < len(line) else 0
+        position[0] = p
+        return output
+    
+    @staticmethod
+    @jit(nopython=True)
+    def _apply_chorus_mod(signal: np.ndarray, depth: np.ndarray, rate: np.ndarray, mix: np.ndarray, sample_rate=44100) -> np.ndarray:
+        num_samples = len(signal)
+        output = np.zeros(num_samples)
+        phase = 0.0
+        
+        for i in range(num_samples):
+            delay = int(np.sin(2 * np.pi * phase) * depth[i] * sample_rate)
+            wet_signal = signal[i - delay] if 0 <= i - delay < num_samples else 0
+            output[i] = (1.0 - mix[i]) * signal[i] + mix[i] * (signal[i] + wet_signal)
+            phase += rate[i] / sample_rate
+        return output
+    
+    @staticmethod
+    @jit(nopython=True)
+    def _apply_tremolo_mod(signal: np.ndarray, depth: np.ndarray, rate: np.ndarray, sample_rate=44100) -> np.ndarray:
+        num_samples = len(signal)
+        output = np.zeros(num_samples)
+        phase = 0.0
+        
+        for i in range(num_samples):
+            output[i] = signal[i] * (1 - depth[i] * (0.5 * (1 + np.sin(2 * np.pi * phase))))
+            phase += rate[i] / sample_rate
+        return output
+    
+    def _process_modulated(self, signal: np.ndarray, index: int, effect: str, params: dict, modulation: dict) -> np.ndarray:
+        for param in modulation:
+            if param not in MODULATABLE_PARAMS[effect]:
+                raise ValueError(f'Parameter {param} of {effect} can not be modulated')
+            
+        defaults = {'decay': 0.5, 'feedback': 0.5, 'mix': 0.5, 'depth': 0.5 if effect == 'tremolo' else 0.01, 'rate': 5.0 if effect == 'tremolo' else 0.1}
+        params = dict(params)
+        for param in MODULATABLE_PARAMS[effect]:
+            if param in modulation:
+                params[param] = modulation[param]
+            else:
+                params[param] = np.full(len(signal), params.get(param, defaults[param]), dtype=np.float64)
+                
+        if effect == 'reverb':
+            line, position, params = self._line(index, effect, params)
+            return self._apply_reverb_mod(signal, line, position, **params)
+        elif effect == 'delay':
+            line, position, params = self._line(index, effect, params)
+            return self._apply_delay_mod(signal, line, position, **params)
+        elif effect == 'chorus':
+            return self._apply_chorus_mod(signal, **params)
+        else:
+            return self._apply_tremolo_mod(signal, **params)
+    
+    def process(self, signal: np.ndarray, modulation=None) -> np.ndarray:
+        """
+        Apply the effect chain
+        
+        params:
+        - signal (np.ndarray): input signal
+        - modulation (dict): optional {effect index: {param: per-sample array}}, see MODULATABLE_PARAMS
+        
+        return:
+        - np.ndarray: processed signal
+        """
+        # reverb / delay tails ring across blocks, bypass only once they have decayed as well
+        if np.max(np.abs(signal), initial=0.0) < self.silence_threshold and self.is_silent():
+            for line, _ in self.lines.values():
+                line[:] = 0.0
+            return np.zeros_like(signal)
+        
+        for index, (effect, params) in enumerate(self.effects):
+            if modulation is not None and index in modulation:
+                signal = self._process_modulated(signal, index, effect, params, modulation[index])
+            elif effect == 'reverb':
+                line, position, kernel_params = self._line(index, effect, params)
+                signal = self._apply_reverb(signal, line, position, **kernel_params)
             elif effect == 'delay':
-                signal = self._apply_delay(signal, **params)
+                line, position, kernel_params = self._line(index, effect, params)
+                signal = self._apply_delay(signal, line, position, **kernel_params)
             elif effect == 'chorus':
                 signal = self._apply_chorus(signal, **params)
             elif effect == 'tremolo':
@@ -0,0 +1,206 @@
+# mod_matrix.py
+
+import numpy as np
+from numba import jit
+
+from components.envelope_generator import EnvelopeGenerator
+
+@jit(nopython=True)
+def _interpolate_controls(out: np.ndarray, points: np.ndarray, offset: int, control_period: int) -> np.ndarray:
+    # points[:, j] is the value at the j-th control point, the block starts `offset` samples after points[:, 0]
+    for d in range(out.shape[0]):
+        position = offset
+        seg = 0
+        for i in range(out.shape[1]):
+            out[d, i] = points[d, seg] + (points[d, seg + 1] - points[d, seg]) * (position / control_period)
+            position += 1
+            if position >= control_period:
+                position = 0
+                seg += 1
+    return out
+
+class LFO:
+    """Low frequency oscillator, a modulation source evaluated at control rate"""
+    def __init__(self, waveform='sine', rate=5.0, phase=0.0, retrigger=False):
+        """
+        Initialize LFO
+        
+        params:
+        - waveform (str): waveform type, ['sine', 'triangle', 'square', 'sawtooth']
+        - rate (float): frequency (Hz)
+        - phase (float): start phase (cycles), range[0, 1)
+        - retrigger (bool): restart from `phase` on every note_on
+        """
+        self.waveform = waveform.lower()
+        self.rate = rate
+        self.phase = phase
+        self.retrigger = retrigger
+        
+        self.position = phase
+        
+    def note_on(self):
+        if self.retrigger:
+            self.position = self.phase
+            
+    def values(self, num_points: int, control_rate: float) -> np.ndarray:
+        """Next `num_points` values, range[-1, 1]"""
+        p = self.position + np.arange(num_points) * (self.rate / control_rate)
+        self.position = (self.position + num_points * self.rate / control_rate) % 1.0
+        p = p % 1.0
+        
+        if self.waveform == 'sine':
+            return np.sin(2 * np.pi * p)
+        elif self.waveform == 'triangle':
+            return 1 - 4 * np.abs(p - 0.5)
+        elif self.waveform == 'square':
+            return np.where(p < 0.5, 1.0, -1.0)
+        elif self.waveform == 'sawtooth':
+            return 2 * p - 1
+        else:
+            raise ValueError(f'Unsupported LFO waveform: {self.waveform}')
+
+class ModulationMatrix:
+    """
+    Modulation matrix, routes sources evaluated at control rate to parameters.
+    Destination values are linearly interpolated between control points, so the
+    returned per-sample arrays can drive `Oscillator.render`, `FMSynth.render`,
+    `Filter.apply` and `FXProcessor.process` without zipper noise.
+    
+    Built-in sources:
+    - 'velocity': note velocity, range[0, 1]
+    - 'note': semitones from middle C (MIDI note 60)
+    """
+    def __init__(self, sample_rate=44100, control_period=32):
+        """
+        Initialize ModulationMatrix
+        
+        params:
+        - sample_rate (int): sample rate
+        - control_period (int): samples between control points
+        """
+        self.sample_rate = sample_rate
+        self.control_period = control_period
+        self.control_rate = sample_rate / control_period
+        
+        self.sources = {}
+        self.destinations = {}
+        self.routes = []
+        
+        self.note = 60
+        self.velocity = 1.0
+        
+        self._points = None
+        self._offset = 0
+        self._buffer = None
+        
+    def add_source(self, name: str, source):
+        """
+        Add modulation source
+        
+        params:
+        - name (str): source name
+        - source (LFO | EnvelopeGenerator): envelope must run at `control_rate`
+        """
+        if name in self.sources or name in ['velocity', 'note']:
+            raise ValueError(f'Source already exists: {name}')
+        if isinstance(source, EnvelopeGenerator) and source.sample_rate != self.control_rate:
+            raise ValueError(f'Envelope source must run at the control rate: {self.control_rate}')
+        self.sources[name] = source
+        self._points = None
+        
+    def add_destination(self, name: str, base: float, minimum=-np.inf, maximum=np.inf):
+        """
+        Add destination parameter
+        
+        params:
+        - name (str): destination name
+        - base (float): value without modulation
+        - minimum (float): lower bound of the modulated value
+        - maximum (float): upper bound of the modulated value
+        """
+        self.destinations[name] = [base, minimum, maximum]
+        self._points = None
+        
+    def set_base(self, name: str, base: float):
+        """Set the unmodulated value of a destination"""
+        if name not in self.destinations:
+            raise ValueError(f'Unknown destination: {name}')
+        self.destinations[name][0] = base
+        
+    def add_route(self, source: str, destination: str, depth: float):
+        """
+        Route source to destination, adds `depth * source` to the destination
+        
+        params:
+        - source (str): source name
+        - destination (str): destination name
+        - depth (float): modulation depth, in units of the destination
+        """
+        if source not in self.sources and source not in ['velocity', 'note']:
+            raise ValueError(f'Unknown source: {source}')
+        if destination not in self.destinations:
+            raise ValueError(f'Unknown destination: {destination}')
+        self.routes.append((source, destination, depth))
+        
+    def clear_routes(self):
+        """Remove all routes"""
+        self.routes = []
+        
+    def note_on(self, note: int, velocity=1.0):
+        """Set note sources and trigger envelope sources and LFOs"""
+        self.note = note
+        self.velocity = velocity
+        for source in self.sources.values():
+            source.note_on()
+            
+    def note_off(self):
+        """Release envelope sources"""
+        for source in self.sources.values():
+            if isinstance(source, EnvelopeGenerator):
+                source.note_off()
+                
+    def _evaluate(self, num_points: int) -> np.ndarray:
+        names = list(self.destinations)
+        values = {}
+        for name, source in self.sources.items():
+            if isinstance(source, EnvelopeGenerator):
+                values[name] = source.render(num_points)
+            else:
+                values[name] = source.values(num_points, self.control_rate)
+        values['velocity'] = np.full(num_points, self.velocity)
+        values['note'] = np.full(num_points, self.note - 60.0)
+        
+        points = np.empty((len(names), num_points))
+        for d, name in enumerate(names):
+            points[d] = self.destinations[name][0]
+        for source, destination, depth in self.routes:
+            points[names.index(destination)] += depth * values[source]
+        for d, name in enumerate(names):
+            np.clip(points[d], self.destinations[name][1], self.destinations[name][2], out=points[d])
+        return points
+        
+    def process(self, num_samples: int) -> dict:
+        """
+        Advance the matrix by one block
+        
+        params:
+        - num_samples (int): block length
+        
+        return:
+        - dict: destination name -> per-sample values, views into a buffer reused by the next call
+        """
+        if self._points is None:
+            self._points = self._evaluate(2)
+            self._offset = 0
+            
+        num_new = (self._offset + num_samples) // self.control_period
+        points = np.concatenate([self._points, self._evaluate(num_new)], axis=1) if num_new > 0 else self._points
+        
+        if self._buffer is None or self._buffer.shape != (len(self.destinations), num_samples):
+            self._buffer = np.zeros((len(self.destinations), num_samples))
+        _interpolate_controls(self._buffer, points, self._offset, self.control_period)
+        
+        self._points = points[:, num_new : num_new + 2].copy()
+        self._offset = (self._offset + num_samples) % self.control_period
+        
+        return {name: self._buffer[d] for d, name in enumerate(self.destinations)}
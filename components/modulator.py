@@ -3,33 +3,79 @@
 import numpy as np
 from numba import jit
 
+@jit(nopython=True)
+def _modulate_block(out: np.ndarray, carrier_signal: np.ndarray, modulator_signal: np.ndarray, ring: bool, modulation_index: float, modulator_range: float) -> np.ndarray:
+    # sample by sample, `out` may be the carrier buffer itself
+    scale = modulation_index / modulator_range
+    for i in range(len(out)):
+        if ring:
+            out[i] = carrier_signal[i] * ((1.0 - modulation_index) + scale * modulator_signal[i])
+        else:
+            out[i] = carrier_signal[i] * (1.0 + scale * modulator_signal[i])
+    return out
+
 class Modulator:
     """
     Modulator class, modulates the carrier signal.
-    Supports amplitude modulation (AM) and frequency modulation (FM)
+    Supports amplitude modulation (AM), ring modulation (RM) and frequency modulation (FM)
     """
     
-    def __init__(self, modulation_type='AM', modulation_index=1.0):
+    def __init__(self, modulation_type='AM', modulation_index=1.0, modulator_range=None):
         """
         Initialize modulator
         
         params:
-        - modulation_type (str): type of modulation: AM, FM
-        - modulation_index (float): depth of modulation
+        - modulation_type (str): type of modulation: AM, RM, FM
+        - modulation_index (float): depth of modulation, for RM the wet amount, range[0, 1]
+        - modulator_range (float): declared peak of the modulator signal, used instead of normalizing
+          by the peak of each modulator array. `process` assumes 1.0 when not declared
         """
         
         self.modulation_type = modulation_type.upper()
         self.modulation_index = modulation_index
+        self.modulator_range = None
+        if modulator_range is not None:
+            self.set_modulator_range(modulator_range)
         
     def set_modulation_type(self, modulation_type: str):
-        """Set modulation type: AM, FM"""
-        if modulation_type == 'AM' or modulation_type == 'FM':
-            self.modulation_type = modulation_type.upper()
-        raise ValueError(f'Unsupported modulation type: {modulation_type}')
+        """Set modulation type: AM, RM, FM"""
+        if modulation_type.upper() not in ['AM', 'RM', 'FM']:
+            raise ValueError(f'Unsupported modulation type: {modulation_type}')
+        self.modulation_type = modulation_type.upper()
     
     def set_modulation_index(self, modulation_index: float):
         self.modulation_index = modulation_index
         
+    def set_modulator_range(self, modulator_range: float):
+        """Set declared peak of the modulator signal"""
+        if modulator_range <= 0:
+            raise ValueError("Modulator range must be positive")
+        self.modulator_range = modulator_range
+        
+    def process(self, carrier_signal: np.ndarray, modulator_signal: np.ndarray, out=None) -> np.ndarray:
+        """
+        Streaming AM / RM, the result does not depend on how the signals are split into blocks
+        
+        params:
+        - carrier_signal (np.ndarray): block of carrier signal
+        - modulator_signal (np.ndarray): block of modulator signal, same length as the carrier
+        - out (np.ndarray): optional output buffer of the carrier length, may be `carrier_signal` for in-place processing
+        
+        return:
+        - np.ndarray: modulated block
+        """
+        if self.modulation_type not in ['AM', 'RM']:
+            raise ValueError(f'Streaming is not supported for {self.modulation_type} modulation, use FMSynth for FM')
+        if len(carrier_signal) != len(modulator_signal):
+            raise ValueError("Carrier and modulator blocks must have the same length")
+        if out is None:
+            out = np.empty(len(carrier_signal))
+        elif len(out) != len(carrier_signal):
+            raise ValueError("Output buffer must have the same length as the carrier block")
+            
+        modulator_range = self.modulator_range if self.modulator_range is not None else 1.0
+        return _modulate_block(out, carrier_signal, modulator_signal, self.modulation_type == 'RM', self.modulation_index, modulator_range)
+        
     def modulate(self, carrier_signal: np.ndarray, modulator_signal: np.ndarray, carrier_frequency=None, t=None) -> np.ndarray:
         """
         Modulate the carrier signal
@@ -44,6 +90,9 @@ class Modulator:
         - np.ndarray: modulated signal
         """
         
+        if self.modulation_type in ['AM', 'RM'] and self.modulator_range is not None:
+            return self.process(carrier_signal, modulator_signal)
+        
         return Modulator._modulate(
             modulation_type=self.modulation_type,
             modulation_index=self.modulation_index,
@@ -56,9 +105,13 @@ class Modulator:
     @staticmethod
     @jit(nopython=True)
     def _modulate(modulation_type: str, modulation_index: float, carrier_signal: np.ndarray, modulator_signal: np.ndarray, carrier_frequency=None, t=None) -> np.ndarray:
-        if modulation_type == 'AM':
-            norm = modulator_signal / np.max(np.abs(modulator_signal))
-            signal = (1 + modulation_index * norm) * carrier_signal
+        if modulation_type == 'AM' or modulation_type == 'RM':
+            peak = np.max(np.abs(modulator_signal))
+            norm = modulator_signal / peak if peak > 0 else np.zeros_like(modulator_signal)
+            if modulation_type == 'AM':
+                signal = (1 + modulation_index * norm) * carrier_signal
+            else:
+                signal = ((1 - modulation_index) + modulation_index * norm) * carrier_signal
         elif modulation_type == 'FM':
             if carrier_frequency is None or t is None:
                 raise ValueError("`carrier_frequency` and `t` parameters are required for FM modulation.")
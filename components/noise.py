@@ -0,0 +1,130 @@
+# noise.py
+
+from itertools import count
+
+import numpy as np
+from numba import jit
+
+_MASK = (1 << 64) - 1
+_GOLDEN = 0x9E3779B97F4A7C15
+
+# default streams start above any explicit index so they never collide with one
+_default_streams = count(1 << 32)
+
+# color codes passed to the kernel
+_COLORS = {'white': 0, 'pink': 1, 'brown': 2}
+
+def _splitmix64(x: int) -> int:
+    x = (x + _GOLDEN) & _MASK
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & _MASK
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & _MASK
+    return x ^ (x >> 31)
+
+@jit(nopython=True, nogil=True)
+def _uniform(key, counter):
+    # counter-based: the n-th value of a stream only depends on (key, n)
+    x = key + counter * np.uint64(0x9E3779B97F4A7C15)
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    x = x ^ (x >> np.uint64(31))
+    return (x >> np.uint64(11)) * (2.0 / 9007199254740992.0) - 1.0
+
+@jit(nopython=True, nogil=True)
+def _render_noise(out, counter_state, filter_state, color, amplitude):
+    # one loop per color, so the sample loop does not branch on it
+    key = counter_state[0]
+    counter = counter_state[1]
+    b = filter_state
+    
+    if color == 0:
+        for i in range(len(out)):
+            out[i] = amplitude * _uniform(key, counter)
+            counter += np.uint64(1)
+    elif color == 1:
+        for i in range(len(out)):
+            white = _uniform(key, counter)
+            counter += np.uint64(1)
+            # Paul Kellet's refined pink filter
+            b[0] = 0.99886 * b[0] + white * 0.0555179
+            b[1] = 0.99332 * b[1] + white * 0.0750759
+            b[2] = 0.96900 * b[2] + white * 0.1538520
+            b[3] = 0.86650 * b[3] + white * 0.3104856
+            b[4] = 0.55000 * b[4] + white * 0.5329522
+            b[5] = -0.7616 * b[5] - white * 0.0168980
+            out[i] = amplitude * (b[0] + b[1] + b[2] + b[3] + b[4] + b[5] + b[6] + white * 0.5362) * 0.11
+            b[6] = white * 0.115926
+    else:
+        for i in range(len(out)):
+            white = _uniform(key, counter)
+            counter += np.uint64(1)
+            # leaky integrator of white noise
+            b[0] = (b[0] + 0.02 * white) / 1.02
+            out[i] = amplitude * b[0] * 3.5
+        
+    counter_state[1] = counter
+    return out
+
+class NoiseGenerator:
+    """
+    Noise source with its own counter-based random stream.
+    Streams with different (seed, stream) pairs are independent, and a stream
+    continues across blocks, so every voice and worker can own one.
+    Without an explicit `stream` every generator gets a stream of its own.
+    """
+    def __init__(self, color='white', amplitude=1.0, seed=2024, stream=None):
+        """
+        Initialize NoiseGenerator
+        
+        params:
+        - color (str): noise color, ['white', 'pink', 'brown']
+        - amplitude (float): noise amplitude
+        - seed (int): seed shared by related streams
+        - stream (int): stream index, e.g. voice or worker index, defaults to a new unique stream
+        """
+        if stream is None:
+            stream = next(_default_streams)
+        if color.lower() not in _COLORS:
+            raise ValueError(f'Unsupported noise color: {color}')
+        self.color = color.lower()
+        self.amplitude = amplitude
+        self.seed = seed
+        self.stream = stream
+        
+        key = _splitmix64(_splitmix64(seed & _MASK) ^ (stream & _MASK))
+        self.counter_state = np.array([key, 0], dtype=np.uint64)
+        self.filter_state = np.zeros(7)
+        
+    def spawn(self, stream: int):
+        """New generator with the same seed and color on another stream"""
+        return NoiseGenerator(self.color, self.amplitude, self.seed, stream)
+        
+    def set_color(self, color: str):
+        """Set noise color"""
+        if color.lower() not in _COLORS:
+            raise ValueError(f'Unsupported noise color: {color}')
+        self.color = color.lower()
+        self.filter_state[:] = 0.0
+        
+    def reset(self):
+        """Restart the stream from its first value"""
+        self.seek(0)
+        
+    def seek(self, position: int):
+        """Jump to the `position`-th value of the stream, filter state is cleared"""
+        self.counter_state[1] = position
+        self.filter_state[:] = 0.0
+        
+    def render(self, num_samples: int, out=None) -> np.ndarray:
+        """
+        Render the next block of noise
+        
+        params:
+        - num_samples (int): block length
+        - out (np.ndarray): optional output buffer of length `num_samples`
+        
+        return:
+        - np.ndarray: noise block
+        """
+        if out is None:
+            out = np.zeros(num_samples)
+        return _render_noise(out[:num_samples], self.counter_state, self.filter_state, _COLORS[self.color], self.amplitude)
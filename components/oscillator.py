@@ -3,10 +3,68 @@
 import numpy as np
 from numba import jit
 
+from components.noise import NoiseGenerator
+
+# waveform codes passed to `_render_block`
+_WAVEFORMS = {'sine': 0, 'square': 1, 'sawtooth': 2, 'triangle': 3, 'pulse': 4}
+
+@jit(nopython=True)
+def _poly_blep(t, dt):
+    # polynomial correction of a unit step at t = 0, t and dt in cycles
+    if t < dt:
+        t /= dt
+        return t + t - t * t - 1.0
+    elif t > 1.0 - dt:
+        t = (t - 1.0) / dt
+        return t * t + t + t + 1.0
+    return 0.0
+
+@jit(nopython=True)
+def _render_block(out, phases, ratios, sample_rate, waveform, frequency, freq_step, amplitude, amp_step, phase, duty_cycle):
+    # frequency and amplitude are per-sample arrays, a step of 0 holds their first value
+    # every unison copy has its own phase and frequency ratio, copies are summed with equal power
+    num_copies = len(phases)
+    gain = 1.0 / np.sqrt(num_copies)
+    offset = phase / (2 * np.pi)
+    
+    for i in range(len(out)):
+        f = frequency[i * freq_step]
+        acc = 0.0
+        for k in range(num_copies):
+            dt = f * ratios[k] / sample_rate
+            blep_dt = min(abs(dt), 0.5)
+            p = phases[k] + offset
+            p -= np.floor(p)
+            
+            if waveform == 0:
+                value = np.sin(2 * np.pi * p)
+            elif waveform == 1:
+                value = 1.0 if p < 0.5 else -1.0
+                q = p + 0.5
+                value += _poly_blep(p, blep_dt) - _poly_blep(q - np.floor(q), blep_dt)
+            elif waveform == 2:
+                q = p + 0.5
+                q -= np.floor(q)
+                value = 2 * q - 1 - _poly_blep(q, blep_dt)
+            elif waveform == 3:
+                value = 2 * np.abs(2 * (p - np.floor(0.5 + p))) - 1
+            elif waveform == 4:
+                value = 1.0 if p < duty_cycle else -1.0
+                q = p + 1.0 - duty_cycle
+                value += _poly_blep(p, blep_dt) - _poly_blep(q - np.floor(q), blep_dt)
+            else:
+                raise ValueError("Unsupported waveform type")
+            acc += value
+            
+            phases[k] += dt
+            phases[k] -= np.floor(phases[k])
+        out[i] = amplitude[i * amp_step] * gain * acc
+    return out
+
 class Oscillator:
     """Oscillator class, for generating various types of wave"""
     
-    def __init__(self, waveform='sine', frequency=440.0, amplitude=1.0, phase=0.0, duty_cycle=0.5):
+    def __init__(self, waveform='sine', frequency=440.0, amplitude=1.0, phase=0.0, duty_cycle=0.5, seed=2024, stream=None, unison_voices=1, detune=0.0, spread=0.0):
         """
         Initialize the oscillator
         
@@ -16,6 +74,11 @@ class Oscillator:
         - amplitude (float): wave amplitude, default=1.0
         - phase (float): Radian, default=0.0
         - duty_cycle (float): only for pulse wave, range from 0.0 to 1.0
+        - seed (int): only for noise, seed of the noise stream
+        - stream (int): only for noise, stream index, defaults to a new unique stream per oscillator
+        - unison_voices (int): detuned copies rendered by `render`, default=1
+        - detune (float): detune of the outermost copies (cents), copies are spaced evenly in between
+        - spread (float): start phase spread of the copies, range from 0.0 (all in phase) to 1.0
         """
         
         self.waveform = waveform.lower()
@@ -24,6 +87,9 @@ class Oscillator:
         self.phase = phase
         self.duty_cycle = duty_cycle
         
+        self.noise = NoiseGenerator('white', seed=seed, stream=stream)
+        self.set_unison(unison_voices, detune, spread)
+        
     def set_waveform(self, waveform: str):
         """Set type of waveform."""
         self.waveform = waveform.lower()
@@ -47,6 +113,20 @@ class Oscillator:
         else:
             raise ValueError("Duty cycle must be between 0.0 and 1.0")
         
+    def set_unison(self, unison_voices: int, detune=0.0, spread=0.0):
+        """Set number of unison copies, their detune (cents) and start phase spread, restarts the phases"""
+        if unison_voices < 1:
+            raise ValueError("Unison voices must be at least 1")
+        if not 0.0 <= spread <= 1.0:
+            raise ValueError("Spread must be between 0.0 and 1.0")
+        self.unison_voices = unison_voices
+        self.detune = detune
+        self.spread = spread
+        
+        cents = detune * np.linspace(-1.0, 1.0, unison_voices) if unison_voices > 1 else np.zeros(1)
+        self.ratios = 2 ** (cents / 1200)
+        self.reset()
+        
     def generate(self, duration: float, sample_rate: int) -> np.ndarray:
         """
         Generate wave signal
@@ -58,6 +138,9 @@ class Oscillator:
         return:
         - np.ndarray: generated wave signal
         """
+        if self.waveform == 'noise':
+            return self.amplitude * self.noise.render(int(sample_rate * duration))
+        
         return Oscillator._generate(
             duration=duration,
             sample_rate=sample_rate,
@@ -68,6 +151,42 @@ class Oscillator:
             duty_cycle=self.duty_cycle
         )
     
+    def reset(self):
+        """Restart the phase accumulators of `render`"""
+        # golden ratio sequence, spread phases that are the same for every note
+        self.state = self.spread * ((np.arange(self.unison_voices) * 0.6180339887498949) % 1.0)
+        
+    def render(self, num_samples: int, sample_rate: int, out=None, frequency=None, amplitude=None) -> np.ndarray:
+        """
+        Render the next block of the wave, the phase continues across blocks.
+        Band-limited (PolyBLEP) square, sawtooth and pulse, all unison copies in one pass
+        
+        params:
+        - num_samples (int): block length
+        - sample_rate (int): sample rate (Hz)
+        - out (np.ndarray): optional output buffer of length `num_samples`
+        - frequency (np.ndarray): optional per-sample frequency (Hz), overrides `self.frequency`
+        - amplitude (np.ndarray): optional per-sample amplitude, overrides `self.amplitude`
+        
+        return:
+        - np.ndarray: rendered block
+        """
+        if out is None:
+            out = np.zeros(num_samples)
+            
+        if self.waveform == 'noise':
+            self.noise.render(num_samples, out=out)
+            out[:num_samples] *= amplitude if amplitude is not None else self.amplitude
+            return out[:num_samples]
+        
+        if self.waveform not in _WAVEFORMS:
+            raise ValueError(f"Unsupported waveform type: {self.waveform}")
+        
+        freq, freq_step = (frequency, 1) if frequency is not None else (np.array([self.frequency], dtype=np.float64), 0)
+        amp, amp_step = (amplitude, 1) if amplitude is not None else (np.array([self.amplitude], dtype=np.float64), 0)
+        
+        return _render_block(out[:num_samples], self.state, self.ratios, sample_rate, _WAVEFORMS[self.waveform], freq, freq_step, amp, amp_step, self.phase, self.duty_cycle)
+    
     @staticmethod
     @jit(nopython=True)
     def _generate(duration: float, sample_rate: int, waveform: str, frequency: float, amplitude: float, phase: float, duty_cycle: float) -> np.ndarray:
@@ -84,9 +203,6 @@ class Oscillator:
             signal = amplitude * (2 * (t * frequency - np.floor(0.5 + t * frequency)))
         elif waveform == 'triangle':
             signal = amplitude * (2 * np.abs(2 * (t * frequency - np.floor(0.5 + t * frequency))) - 1)
-        elif waveform == 'noise':
-            np.random.seed(2024)
-            signal = amplitude * np.random.uniform(-1, 1, size=num_samples)
         elif waveform == 'pulse':
             signal = amplitude * (np.mod(omega * t + phi, 2 * np.pi) < (2 * np.pi * duty_cycle)).astype(np.float64) * 2 - 1
         else:
@@ -0,0 +1,211 @@
+# patch.py
+
+import hashlib
+import json
+import os
+import tempfile
+
+import numpy as np
+
+from components.oscillator import Oscillator
+from components.mixer import Mixer
+from components.filter import Filter
+from components.envelope_generator import EnvelopeGenerator
+from components.modulator import Modulator
+from components.fxprocessor import FXProcessor
+
+PATCH_VERSION = 1
+
+class PatchCache:
+    """
+    Content-addressed disk cache for derived patch data (filter coefficients).
+    Each patch has one raw float64 file named by the hash of the settings its data
+    is derived from, so a warm load is a single small read, entries can be shared
+    by every worker and never need invalidation.
+    """
+    def __init__(self, directory: str):
+        """
+        Initialize PatchCache
+        
+        params:
+        - directory (str): cache directory, created if missing
+        """
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        
+    @staticmethod
+    def key(settings: dict) -> str:
+        """Hash of the settings an entry is derived from"""
+        content = json.dumps({'version': PATCH_VERSION, 'settings': settings}, sort_keys=True)
+        return hashlib.sha256(content.encode('utf-8')).hexdigest()
+        
+    def get(self, settings: dict, compute) -> np.ndarray:
+        """
+        Load an entry, computing and storing it on a miss
+        
+        params:
+        - settings (dict): JSON-serializable settings the entry is derived from
+        - compute (callable): returns the derived data as one float64 array
+        
+        return:
+        - np.ndarray: derived data
+        """
+        path = os.path.join(self.directory, self.key(settings) + '.f64')
+        try:
+            return np.fromfile(path)
+        except FileNotFoundError:
+            pass
+            
+        data = np.ascontiguousarray(compute(), dtype=np.float64)
+        # write to a temporary file first, concurrent workers never see a partial entry
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.f64')
+        with os.fdopen(fd, 'wb') as f:
+            data.tofile(f)
+        os.replace(temp_path, path)
+        return data
+
+class Patch:
+    """Instrument settings: oscillators with mixer weights, filter, envelope, modulator and FX chain"""
+    def __init__(self, sample_rate=44100):
+        """
+        Initialize Patch
+        
+        params:
+        - sample_rate (int): sample rate
+        """
+        self.sample_rate = sample_rate
+        self.mixer = Mixer()
+        self.filter = None
+        self.envelope = None
+        self.modulator = None
+        self.fx = None
+        
+    def to_dict(self) -> dict:
+        """Versioned, JSON-serializable settings"""
+        data = {
+            'version': PATCH_VERSION,
+            'sample_rate': self.sample_rate,
+            'oscillators': [
+                {
+                    'waveform': osc.waveform,
+                    'frequency': osc.frequency,
+                    'amplitude': osc.amplitude,
+                    'phase': osc.phase,
+                    'duty_cycle': osc.duty_cycle,
+                    'seed': osc.noise.seed,
+                    'stream': osc.noise.stream,
+                    'unison_voices': osc.unison_voices,
+                    'detune': osc.detune,
+                    'spread': osc.spread,
+                    'weight': weight,
+                }
+                for osc, weight in zip(self.mixer.oscillators, self.mixer.weights)
+            ],
+            'filter': None,
+            'envelope': None,
+            'modulator': None,
+            'fx': None,
+        }
+        if self.filter is not None:
+            data['filter'] = _filter_settings(self.filter)
+        if self.envelope is not None:
+            data['envelope'] = _envelope_settings(self.envelope)
+        if self.modulator is not None:
+            data['modulator'] = {
+                'modulation_type': self.modulator.modulation_type,
+                'modulation_index': self.modulator.modulation_index,
+                'modulator_range': self.modulator.modulator_range,
+            }
+        if self.fx is not None:
+            data['fx'] = [{'effect': effect, 'params': params} for effect, params in self.fx.effects]
+        return data
+        
+    def save(self, path: str):
+        """Write the patch as JSON"""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+def _filter_settings(filter_instance: Filter) -> dict:
+    cutoff = filter_instance.cutoff
+    return {
+        'filter_type': filter_instance.filter_type,
+        'cutoff': list(cutoff) if isinstance(cutoff, (list, tuple)) else cutoff,
+        'order': filter_instance.order,
+        'sample_rate': filter_instance.sample_rate,
+        'bandwidth': filter_instance.bandwidth,
+    }
+
+def _envelope_settings(envelope: EnvelopeGenerator) -> dict:
+    return {
+        'attack': envelope.attack,
+        'decay': envelope.decay,
+        'sustain_level': envelope.sustain_level,
+        'release': envelope.release,
+        'sample_rate': envelope.sample_rate,
+        'curve': envelope.curve,
+    }
+
+def _filter_coefficients(settings: dict) -> np.ndarray:
+    # b and a of a Butterworth design have the same length
+    designed = Filter(**settings)
+    return np.concatenate([designed.b, designed.a])
+
+def patch_from_dict(data: dict, cache=None) -> Patch:
+    """
+    Build a patch from `Patch.to_dict` settings
+    
+    params:
+    - data (dict): patch settings
+    - cache (PatchCache): optional cache, the filter design is loaded from it
+    
+    return:
+    - Patch: patch with instantiated components
+    """
+    version = data.get('version')
+    if version is None or version > PATCH_VERSION:
+        raise ValueError(f'Unsupported patch version: {version}')
+        
+    patch = Patch(sample_rate=data['sample_rate'])
+    
+    for settings in data['oscillators']:
+        settings = dict(settings)
+        weight = settings.pop('weight', 1.0)
+        patch.mixer.add_oscillator(Oscillator(**settings), weight=weight)
+        
+    if data.get('filter') is not None:
+        settings = dict(data['filter'])
+        if isinstance(settings['cutoff'], list):
+            settings['cutoff'] = tuple(settings['cutoff'])
+        if cache is None:
+            patch.filter = Filter(**settings)
+        else:
+            b, a = np.split(cache.get({'filter': data['filter']}, lambda: _filter_coefficients(settings)), 2)
+            patch.filter = Filter(**settings, coefficients=(b, a))
+            
+    if data.get('envelope') is not None:
+        # curves are built lazily by `generate`, the block `render` path does not use them
+        patch.envelope = EnvelopeGenerator(**data['envelope'])
+            
+    if data.get('modulator') is not None:
+        patch.modulator = Modulator(**data['modulator'])
+        
+    if data.get('fx') is not None:
+        patch.fx = FXProcessor(sample_rate=data['sample_rate'])
+        for effect in data['fx']:
+            patch.fx.add_effect(effect['effect'], **effect['params'])
+            
+    return patch
+
+def load_patch(path: str, cache=None) -> Patch:
+    """
+    Load a patch written by `Patch.save`
+    
+    params:
+    - path (str): JSON patch file
+    - cache (PatchCache): optional cache of derived data
+    
+    return:
+    - Patch: patch with instantiated components
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        return patch_from_dict(json.load(f), cache=cache)
@@ -0,0 +1,332 @@
+# patch_graph.py
+
+import numpy as np
+
+from components.oscillator import Oscillator
+from components.mixer import Mixer
+from components.filter import Filter
+from components.envelope_generator import EnvelopeGenerator
+from components.modulator import Modulator
+from components.fxprocessor import FXProcessor
+from components.fm_synth import FMSynth
+
+# input ports accepted by each node type, 'in' and 'modulator' carry audio, the rest carry control
+PORTS = {
+    'oscillator': ('frequency', 'amplitude'),
+    'fm': ('frequency', 'amplitude'),
+    'mixer': ('in',),
+    'filter': ('in', 'cutoff'),
+    'envelope': (),
+    'modulator': ('in', 'modulator'),
+    'fx': ('in',),
+    'gain': ('in', 'gain'),
+    'sum': ('in',),
+    'constant': (),
+}
+
+def _node_type(component) -> str:
+    if isinstance(component, Oscillator):
+        return 'oscillator'
+    elif isinstance(component, FMSynth):
+        return 'fm'
+    elif isinstance(component, Mixer):
+        return 'mixer'
+    elif isinstance(component, Filter):
+        return 'filter'
+    elif isinstance(component, EnvelopeGenerator):
+        return 'envelope'
+    elif isinstance(component, Modulator):
+        return 'modulator'
+    elif isinstance(component, FXProcessor):
+        return 'fx'
+    else:
+        raise ValueError(f'Unsupported component: {type(component).__name__}')
+
+class PatchGraph:
+    """
+    Patch graph, nodes wrap components and edges carry audio or control blocks.
+    `compile` sorts the nodes, fuses trivial gain / sum nodes into edge gains and
+    assigns block buffers by liveness so intermediate signals share memory.
+    """
+    def __init__(self, sample_rate=44100, block_size=1024):
+        """
+        Initialize PatchGraph
+        
+        params:
+        - sample_rate (int): sample rate
+        - block_size (int): maximum samples per `render` call
+        """
+        self.sample_rate = sample_rate
+        self.block_size = block_size
+        
+        self.nodes = {}
+        self.key_ratios = {}
+        self.edges = []
+        self.output = None
+        
+        self.schedule = None
+        self.num_buffers = 0
+        self._buffers = None
+        
+    def add_node(self, name: str, component, key_ratio=None):
+        """
+        Add node wrapping a component
+        
+        params:
+        - name (str): node name
+        - component: Oscillator, FMSynth, Mixer, Filter, EnvelopeGenerator, Modulator or FXProcessor
+        - key_ratio (float): only for Oscillator, follow the note_on frequency times this ratio
+        """
+        node_type = _node_type(component)
+        if key_ratio is not None and node_type != 'oscillator':
+            raise ValueError(f'Key tracking is only supported for oscillator nodes, not {node_type}')
+        self._add(name, node_type, component)
+        if key_ratio is not None:
+            self.key_ratios[name] = key_ratio
+        
+    def add_gain(self, name: str, gain=1.0):
+        """Add gain node, a control signal on port 'gain' multiplies on top of `gain`"""
+        self._add(name, 'gain', gain)
+        
+    def add_sum(self, name: str):
+        """Add sum node, sums everything connected to port 'in'"""
+        self._add(name, 'sum', None)
+        
+    def add_constant(self, name: str, value: float):
+        """Add constant control source"""
+        self._add(name, 'constant', value)
+        
+    def _add(self, name: str, node_type: str, component):
+        if name in self.nodes:
+            raise ValueError(f'Node already exists: {name}')
+        self.nodes[name] = (node_type, component)
+        self.schedule = None
+        
+    def connect(self, source: str, destination: str, port='in', gain=1.0):
+        """
+        Connect output of `source` to an input port of `destination`, several edges into one port are summed
+        
+        params:
+        - source (str): source node name
+        - destination (str): destination node name
+        - port (str): input port, see PORTS
+        - gain (float): edge gain
+        """
+        if source not in self.nodes or destination not in self.nodes:
+            raise ValueError(f'Unknown node in edge: {source} -> {destination}')
+        if port not in PORTS[self.nodes[destination][0]]:
+            raise ValueError(f'Node {destination} has no port: {port}')
+        self.edges.append((source, destination, port, gain))
+        self.schedule = None
+        
+    def set_output(self, name: str):
+        """Set the node whose output `render` returns"""
+        if name not in self.nodes:
+            raise ValueError(f'Unknown node: {name}')
+        self.output = name
+        self.schedule = None
+        
+    def note_on(self, frequency: float, velocity=1.0):
+        """
+        Start a note: trigger envelopes and FM voices, retune key-tracked oscillators and restart
+        the phases of every oscillator. Oscillators added without `key_ratio`, including those
+        in mixers, keep their own frequency
+        
+        params:
+        - frequency (float): note frequency (Hz)
+        - velocity (float): note velocity, only for FM voices
+        """
+        for name, (node_type, component) in self.nodes.items():
+            if node_type == 'envelope':
+                component.note_on()
+            elif node_type == 'fm':
+                component.note_on(frequency, velocity)
+            elif node_type == 'oscillator':
+                if name in self.key_ratios:
+                    component.frequency = frequency * self.key_ratios[name]
+                component.reset()
+            elif node_type == 'mixer':
+                for osc in component.oscillators:
+                    osc.reset()
+                
+    def note_off(self):
+        """Release envelopes and FM voices"""
+        for node_type, component in self.nodes.values():
+            if node_type in ['envelope', 'fm']:
+                component.note_off()
+                
+    def _fuse(self) -> list:
+        # replace gain nodes without control input and sum nodes by edge gains
+        edges = list(self.edges)
+        while True:
+            for name, (node_type, component) in self.nodes.items():
+                if name == self.output or node_type not in ['gain', 'sum']:
+                    continue
+                incoming = [e for e in edges if e[1] == name]
+                if any(port != 'in' for _, _, port, _ in incoming):
+                    continue
+                if any(e[0] == name for e in incoming):
+                    continue
+                outgoing = [e for e in edges if e[0] == name]
+                if not incoming and not outgoing:
+                    continue
+                node_gain = component if node_type == 'gain' else 1.0
+                edges = [e for e in edges if e[0] != name and e[1] != name]
+                edges += [(src, dst, port, g_in * node_gain * g_out) for src, _, _, g_in in incoming for _, dst, port, g_out in outgoing]
+                break
+            else:
+                return edges
+                
+    def _sort(self, edges: list) -> list:
+        # ancestors of the output in topological order
+        needed = {self.output}
+        stack = [self.output]
+        while stack:
+            name = stack.pop()
+            for src, dst, _, _ in edges:
+                if dst == name and src not in needed:
+                    needed.add(src)
+                    stack.append(src)
+                    
+        indegree = {name: 0 for name in needed}
+        for src, dst, _, _ in edges:
+            if dst in needed:
+                indegree[dst] += 1
+        ready = [name for name in self.nodes if name in needed and indegree[name] == 0]
+        order = []
+        while ready:
+            name = ready.pop(0)
+            order.append(name)
+            for src, dst, _, _ in edges:
+                if src == name and dst in needed:
+                    indegree[dst] -= 1
+                    if indegree[dst] == 0:
+                        ready.append(dst)
+        if len(order) != len(needed):
+            raise ValueError("Patch graph contains a cycle")
+        return order
+        
+    def compile(self):
+        """Build the schedule and the shared buffer pool"""
+        if self.output is None:
+            raise ValueError("No output node set")
+            
+        edges = self._fuse()
+        order = self._sort(edges)
+        edges = [e for e in edges if e[1] in order]
+        
+        last_use = {}
+        for step, name in enumerate(order):
+            for src, dst, _, _ in edges:
+                if dst == name:
+                    last_use[src] = step
+                    
+        free = []
+        buffer_of = {}
+        schedule = []
+        num_buffers = 0
+        
+        def allocate():
+            nonlocal num_buffers
+            if free:
+                return free.pop()
+            num_buffers += 1
+            return num_buffers - 1
+            
+        for step, name in enumerate(order):
+            node_type, component = self.nodes[name]
+            temps = []
+            
+            ports = {}
+            for port in PORTS[node_type]:
+                sources = [(buffer_of[src], gain) for src, dst, p, gain in edges if dst == name and p == port]
+                if len(sources) == 0:
+                    continue
+                if len(sources) == 1 and sources[0][1] == 1.0:
+                    ports[port] = (sources[0][0], None)
+                else:
+                    temp = allocate()
+                    temps.append(temp)
+                    ports[port] = (temp, sources)
+                    
+            scratch = None
+            if node_type == 'mixer':
+                scratch = allocate()
+                temps.append(scratch)
+                
+            out = allocate()
+            buffer_of[name] = out
+            schedule.append((name, node_type, component, ports, scratch, out))
+            
+            free.extend(temps)
+            for src, used in last_use.items():
+                if used == step and src != self.output:
+                    free.append(buffer_of[src])
+                    
+        self.schedule = schedule
+        self.num_buffers = num_buffers
+        self._buffers = np.zeros((num_buffers, self.block_size))
+        
+    def render(self, num_samples: int) -> np.ndarray:
+        """
+        Render the next block of the output node
+        
+        params:
+        - num_samples (int): block length, at most `block_size`
+        
+        return:
+        - np.ndarray: output block, a view into a buffer reused by the next call
+        """
+        if num_samples > self.block_size:
+            raise ValueError(f'Block of {num_samples} samples exceeds block size {self.block_size}')
+        if self.schedule is None:
+            self.compile()
+            
+        buffers = self._buffers
+        n = num_samples
+        
+        for name, node_type, component, ports, scratch, out in self.schedule:
+            inputs = {}
+            for port, (index, sources) in ports.items():
+                if sources is not None:
+                    acc = buffers[index, :n]
+                    np.multiply(buffers[sources[0][0], :n], sources[0][1], out=acc)
+                    for src, gain in sources[1:]:
+                        acc += gain * buffers[src, :n]
+                inputs[port] = buffers[index, :n]
+            self._run(node_type, component, inputs, buffers[out, :n], None if scratch is None else buffers[scratch, :n], n)
+            
+        return buffers[self.schedule[-1][5], :n]
+        
+    def _run(self, node_type: str, component, inputs: dict, out: np.ndarray, scratch, n: int):
+        signal = inputs.get('in')
+        
+        if node_type == 'oscillator':
+            component.render(n, self.sample_rate, out=out, frequency=inputs.get('frequency'), amplitude=inputs.get('amplitude'))
+        elif node_type == 'fm':
+            component.render(n, out=out, frequency=inputs.get('frequency'), amplitude=inputs.get('amplitude'))
+        elif node_type == 'mixer':
+            out[:] = 0.0 if signal is None else signal
+            for osc, weight in zip(component.oscillators, component.weights):
+                osc.render(n, self.sample_rate, out=scratch)
+                out += weight * scratch
+        elif node_type == 'filter':
+            out[:] = component.apply(self._input(signal, n), cutoff=inputs.get('cutoff'))
+        elif node_type == 'envelope':
+            component.render(n, out=out)
+        elif node_type == 'modulator':
+            component.process(self._input(signal, n), self._input(inputs.get('modulator'), n), out=out)
+        elif node_type == 'fx':
+            out[:] = component.process(self._input(signal, n))
+        elif node_type == 'gain':
+            np.multiply(self._input(signal, n), component, out=out)
+            if 'gain' in inputs:
+                out *= inputs['gain']
+        elif node_type == 'sum':
+            out[:] = 0.0 if signal is None else signal
+        elif node_type == 'constant':
+            out[:] = component
+            
+    @staticmethod
+    def _input(signal, n: int) -> np.ndarray:
+        return np.zeros(n) if signal is None else signal
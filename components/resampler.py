@@ -0,0 +1,152 @@
+# resampler.py
+
+from math import gcd
+
+import numpy as np
+from scipy.signal import firwin, kaiser_beta
+from numba import jit
+
+# filter banks are shared by every resampler with the same ratio
+_bank_cache = {}
+
+# stopband attenuation of the prototype lowpass (dB)
+STOPBAND_ATTENUATION = 80.0
+
+def _filter_bank(up: int, down: int, taps_per_phase: int) -> np.ndarray:
+    key = (up, down, taps_per_phase)
+    if key not in _bank_cache:
+        num_taps = up * taps_per_phase
+        # Kaiser transition width for the attenuation, the stopband starts at the lower Nyquist frequency
+        width = (STOPBAND_ATTENUATION - 7.95) / (2.285 * np.pi * (num_taps - 1))
+        cutoff = 1.0 / max(up, down) - width / 2
+        if cutoff <= width / 2:
+            raise ValueError(f'taps_per_phase={taps_per_phase} is too low for ratio {up}/{down}')
+        prototype = firwin(num_taps, cutoff, window=('kaiser', kaiser_beta(STOPBAND_ATTENUATION))) * up
+        # bank[p, k] = prototype[p + k * up]
+        _bank_cache[key] = np.ascontiguousarray(prototype.reshape(taps_per_phase, up).T)
+    return _bank_cache[key]
+
+@jit(nopython=True)
+def _resample_block(signal: np.ndarray, history: np.ndarray, bank: np.ndarray, up: int, down: int, position: int, out: np.ndarray) -> tuple[int, int]:
+    # `position` is the next output on the upsampled grid, relative to the first sample of `signal`
+    taps = bank.shape[1]
+    num_in = len(signal)
+    count = 0
+    
+    while position < num_in * up:
+        index = position // up
+        phase = position - index * up
+        acc = 0.0
+        for k in range(taps):
+            j = index - k
+            if j >= 0:
+                acc += bank[phase, k] * signal[j]
+            else:
+                acc += bank[phase, k] * history[len(history) + j]
+        out[count] = acc
+        count += 1
+        position += down
+        
+    # keep the last taps - 1 inputs for the next block
+    keep = len(history)
+    if num_in >= keep:
+        history[:] = signal[num_in - keep:]
+    else:
+        history[:keep - num_in] = history[num_in:].copy()
+        history[keep - num_in:] = signal
+        
+    return count, position - num_in * up
+
+class Resampler:
+    """
+    Streaming polyphase resampler, converts by the rational ratio output_rate / input_rate.
+    The Kaiser-window prototype rejects everything above the lower of the two Nyquist
+    frequencies by at least 80 dB, its transition band lies just below that frequency.
+    """
+    def __init__(self, input_rate=48000, output_rate=44100, taps_per_phase=128):
+        """
+        Initialize Resampler
+        
+        params:
+        - input_rate (int): sample rate of the input signal
+        - output_rate (int): sample rate of the output signal
+        - taps_per_phase (int): FIR taps per polyphase branch, higher gives a narrower transition band and is slower
+        """
+        divisor = gcd(int(input_rate), int(output_rate))
+        self.input_rate = input_rate
+        self.output_rate = output_rate
+        self.up = int(output_rate) // divisor
+        self.down = int(input_rate) // divisor
+        self.taps_per_phase = taps_per_phase
+        
+        self.bank = _filter_bank(self.up, self.down, taps_per_phase)
+        self.reset()
+        
+    def reset(self):
+        """Clear the input history"""
+        self.history = np.zeros(self.taps_per_phase - 1)
+        self.position = 0
+        
+    def process(self, signal: np.ndarray, out=None) -> np.ndarray:
+        """
+        Resample a block, state is kept so consecutive blocks form a continuous signal
+        
+        params:
+        - signal (np.ndarray): input block
+        - out (np.ndarray): optional output buffer, at least `max_output(len(signal))` long
+        
+        return:
+        - np.ndarray: resampled block, its length varies by one sample between blocks for non-integer ratios
+        """
+        if out is None:
+            out = np.empty(self.max_output(len(signal)))
+        count, self.position = _resample_block(signal, self.history, self.bank, self.up, self.down, self.position, out)
+        return out[:count]
+        
+    def max_output(self, num_samples: int) -> int:
+        """Upper bound of output samples for an input block of `num_samples`"""
+        return (num_samples * self.up) // self.down + 1
+
+class Oversampler:
+    """Integer oversampling around a sub-chain, e.g. naive waveforms or nonlinear stages"""
+    def __init__(self, factor=2, sample_rate=44100, taps_per_phase=128):
+        """
+        Initialize Oversampler
+        
+        params:
+        - factor (int): oversampling factor, e.g. 2, 4
+        - sample_rate (int): base sample rate
+        - taps_per_phase (int): FIR taps per polyphase branch
+        """
+        self.factor = factor
+        self.sample_rate = sample_rate
+        self.oversampled_rate = sample_rate * factor
+        
+        self.upsampler = Resampler(sample_rate, self.oversampled_rate, taps_per_phase)
+        self.downsampler = Resampler(self.oversampled_rate, sample_rate, taps_per_phase)
+        
+    def reset(self):
+        """Clear states of both resamplers"""
+        self.upsampler.reset()
+        self.downsampler.reset()
+        
+    def upsample(self, signal: np.ndarray) -> np.ndarray:
+        """Block at the base rate to `factor` times as many samples"""
+        return self.upsampler.process(signal)
+        
+    def downsample(self, signal: np.ndarray) -> np.ndarray:
+        """Block at the oversampled rate, length a multiple of `factor`, back to the base rate"""
+        return self.downsampler.process(signal)
+        
+    def process(self, signal: np.ndarray, process_fn) -> np.ndarray:
+        """
+        Run `process_fn` at the oversampled rate
+        
+        params:
+        - signal (np.ndarray): input block at the base rate
+        - process_fn (callable): takes and returns a block at `oversampled_rate`
+        
+        return:
+        - np.ndarray: processed block at the base rate, same length as `signal`
+        """
+        return self.downsample(process_fn(self.upsample(signal)))
@@ -0,0 +1,136 @@
+# voice_pool.py
+
+from concurrent.futures import ThreadPoolExecutor
+import os
+
+import numpy as np
+
+# voice states
+_FREE = 0
+_HELD = 1
+_RELEASED = 2
+
+def note_to_frequency(note: int) -> float:
+    """MIDI note number to frequency (Hz), A4 = 69 = 440 Hz"""
+    return 440.0 * 2 ** ((note - 69) / 12)
+
+class VoicePool:
+    """
+    Polyphonic voice pool with voice stealing.
+    In parallel mode the active voices are split into one partition per worker,
+    each partition is rendered by a thread into its own scratch buffer and the
+    partitions are summed in a fixed order, so the output does not depend on
+    thread timing. Serial mode renders the same partitions one after another, so
+    it gives the same output as parallel mode with the same `num_workers`.
+    Voices must render through `nogil` kernels to run in parallel.
+    Released voices are freed once `is_idle()` and their block peak falls below
+    `silence_threshold`, so only audible voices cost CPU.
+    """
+    def __init__(self, voice_factory, max_polyphony=16, parallel=False, num_workers=None, silence_threshold=1e-4):
+        """
+        Initialize VoicePool
+        
+        params:
+        - voice_factory (callable): returns a new voice with note_on(frequency, velocity), note_off(), is_idle() and render(num_samples, out)
+        - max_polyphony (int): number of voices
+        - parallel (bool): render partitions of voices on a thread pool
+        - num_workers (int): number of partitions, defaults to the number of cores
+        - silence_threshold (float): peak below which an idle released voice is freed
+        """
+        self.voices = [voice_factory() for _ in range(max_polyphony)]
+        self.max_polyphony = max_polyphony
+        self.parallel = parallel
+        self.num_workers = min(num_workers or os.cpu_count() or 1, max_polyphony)
+        self.silence_threshold = silence_threshold
+        
+        self.states = [_FREE] * max_polyphony
+        self.notes = [None] * max_polyphony
+        self.ages = [0] * max_polyphony
+        self._clock = 0
+        
+        self._executor = None
+        self._scratch = None
+        
+    def _allocate(self) -> int:
+        for state in [_FREE, _RELEASED, _HELD]:
+            candidates = [i for i in range(self.max_polyphony) if self.states[i] == state]
+            if candidates:
+                return min(candidates, key=lambda i: self.ages[i])
+                
+    def note_on(self, note: int, velocity=1.0):
+        """Start a note on a free voice, or steal the oldest released / held voice"""
+        index = self._allocate()
+        self._clock += 1
+        self.states[index] = _HELD
+        self.notes[index] = note
+        self.ages[index] = self._clock
+        self.voices[index].note_on(note_to_frequency(note), velocity)
+        
+    def note_off(self, note: int):
+        """Release every held voice playing `note`"""
+        for i in range(self.max_polyphony):
+            if self.states[i] == _HELD and self.notes[i] == note:
+                self.states[i] = _RELEASED
+                self.voices[i].note_off()
+                
+    def active_voices(self) -> list:
+        """Indices of voices that are held or releasing"""
+        return [i for i in range(self.max_polyphony) if self.states[i] != _FREE]
+        
+    def _render_partition(self, indices: list, partition: int, num_samples: int) -> tuple[np.ndarray, list]:
+        bus = self._scratch[partition, 0, :num_samples]
+        voice_out = self._scratch[partition, 1, :num_samples]
+        bus[:] = 0.0
+        finished = []
+        for i in indices:
+            voice = self.voices[i]
+            voice.render(num_samples, out=voice_out)
+            bus += voice_out
+            if self.states[i] == _RELEASED and voice.is_idle() and np.max(np.abs(voice_out)) < self.silence_threshold:
+                finished.append(i)
+        return bus, finished
+        
+    def render(self, num_samples: int, out=None) -> np.ndarray:
+        """
+        Render the sum of all active voices for the next block
+        
+        params:
+        - num_samples (int): block length
+        - out (np.ndarray): optional output buffer of length `num_samples`
+        
+        return:
+        - np.ndarray: mixed block
+        """
+        if out is None:
+            out = np.zeros(num_samples)
+        out = out[:num_samples]
+        
+        num_partitions = self.num_workers
+        if self._scratch is None or self._scratch.shape[0] < num_partitions or self._scratch.shape[2] < num_samples:
+            self._scratch = np.zeros((num_partitions, 2, num_samples))
+            
+        active = self.active_voices()
+        partitions = [active[p::num_partitions] for p in range(num_partitions)]
+        partitions = [indices for indices in partitions if indices]
+        
+        if self.parallel and len(partitions) > 1:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.num_workers)
+            futures = [self._executor.submit(self._render_partition, indices, p, num_samples) for p, indices in enumerate(partitions)]
+            results = [future.result() for future in futures]
+        else:
+            results = [self._render_partition(indices, p, num_samples) for p, indices in enumerate(partitions)]
+            
+        out[:] = 0.0
+        for bus, finished in results:
+            out += bus
+            for i in finished:
+                self.states[i] = _FREE
+                self.notes[i] = None
+        return out
+        
+    def close(self):
+        """Shut down the worker threads"""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
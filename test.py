@@ -1,15 +1,33 @@
-from test.mod_test_cases import test_mod
-from test.filter_test_cases import test_filter
+from test.mod_test_cases import test_mod, test_mod_blocks
+from test.osc_test_cases import test_unison
+from test.filter_test_cases import test_filter, test_filter_modulated
 from test.mixer_test_cases import test_mixer
 from test.envgen_test_cases import test_envgen
-from test.fx_test_cases import test_fx
+from test.fx_test_cases import test_fx, test_fx_tail
+from test.fm_test_cases import test_fm
+from test.modmatrix_test_cases import test_modmatrix
+from test.resampler_test_cases import test_resampler
+from test.patch_graph_test_cases import test_patch_graph
+from test.noise_test_cases import test_noise
+from test.patch_test_cases import test_patch
 
-from test.epiano_test_cases import test_epiano
+from test.epiano_test_cases import test_epiano, test_epiano_parallel
 
 if __name__ == '__main__':
     #test_mod('FM')
+    #test_mod_blocks()
     #test_filter()
+    #test_filter_modulated()
     #test_mixer()
     #test_envgen()
     #test_fx()
+    #test_fx_tail()
+    #test_fm('epiano')
+    #test_modmatrix()
+    #test_resampler()
+    #test_patch_graph()
+    #test_noise()
+    #test_unison()
+    #test_patch()
+    #test_epiano_parallel()
     test_epiano()
\ No newline at end of file
@@ -5,12 +5,12 @@ import matplotlib.pyplot as plt
 from asset.epiano import EPiano
 from scipy.io.wavfile import write
 
-def test_epiano():
+def test_epiano(parallel=False):
     sample_rate = 44100
     duration = 4.0  # 总持续时间，单位秒
 
     # 创建 EPiano 实例
-    epiano = EPiano(sample_rate=sample_rate, max_polyphony=16)
+    epiano = EPiano(sample_rate=sample_rate, max_polyphony=16, parallel=parallel)
 
     # 定义音符序列（MIDI 音符编号）及其开始时间和持续时间
     note_sequence = [
@@ -52,14 +52,14 @@ def test_epiano():
 
         # 处理音符事件
         for event in note_events:
-            if event['start_sample'] == start_idx:
+            if start_idx <= event['start_sample'] < end_idx:
                 epiano.note_on(event['note'], event['velocity'])
-            if event['end_sample'] == start_idx:
+            if start_idx <= event['end_sample'] < end_idx:
                 epiano.note_off(event['note'])
 
         # 生成音频块
         audio_chunk = epiano.generate_audio(duration=chunk_duration)
-        audio[start_idx:end_idx-1] = audio_chunk
+        audio[start_idx:end_idx] = audio_chunk
 
         current_sample += (end_idx - start_idx)
 
@@ -79,3 +79,31 @@ def test_epiano():
     plt.grid(True)
     plt.tight_layout()
     plt.show()
+
+def test_epiano_parallel(num_workers=4):
+    sample_rate = 44100
+    chunk_size = 1024
+    num_chunks = 128
+    # overlapping notes, so several partitions hold voices at once
+    notes = [60, 64, 67, 72, 76, 79]
+
+    def render(parallel):
+        epiano = EPiano(sample_rate=sample_rate, max_polyphony=16, parallel=parallel, num_workers=num_workers)
+        blocks = []
+        for chunk_idx in range(num_chunks):
+            if chunk_idx % 8 == 0 and chunk_idx // 8 < len(notes):
+                epiano.note_on(notes[chunk_idx // 8], 1.0)
+            if chunk_idx == 64:
+                for note in notes:
+                    epiano.note_off(note)
+            blocks.append(epiano.generate_audio(duration=chunk_size / sample_rate))
+        epiano.voices.close()
+        return np.concatenate(blocks)
+
+    serial = render(False)
+    parallel = render(True)
+    assert np.max(np.abs(serial)) > 0.0, "EPiano rendered silence"
+    assert np.array_equal(serial, parallel), f"parallel output differs from serial by {np.max(np.abs(serial - parallel))}"
+    assert np.array_equal(parallel, render(True)), "parallel output differs between runs"
+
+    print("EPiano parallel OK")
@@ -1,5 +1,6 @@
 import numpy as np
 import matplotlib.pyplot as plt
+from scipy.signal import butter, lfilter
 from components.oscillator import Oscillator
 from components.filter import Filter
 
@@ -41,3 +42,26 @@ def test_filter():
 
     plt.tight_layout()
     plt.show()
+
+def test_filter_modulated():
+    sample_rate = 44100
+    num_samples = 8192
+    chunk_size = 1024
+    signal = Oscillator(waveform='sawtooth', frequency=220.0).render(num_samples, sample_rate)
+    
+    for order in [2, 4]:
+        # constant cutoff must match a static filter
+        filter_instance = Filter(filter_type='lowpass', cutoff=1000.0, order=order, sample_rate=sample_rate)
+        filtered = np.concatenate([filter_instance.apply(signal[i:i+chunk_size], cutoff=np.full(chunk_size, 1000.0)) for i in range(0, num_samples, chunk_size)])
+        b, a = butter(order, 1000.0 / (0.5 * sample_rate))
+        error = np.max(np.abs(filtered - lfilter(b, a, signal)))
+        assert error < 1e-9, f"order {order}: modulated filter differs from lfilter by {error}"
+        
+        # a cutoff sweep must stay bounded
+        filter_instance = Filter(filter_type='lowpass', cutoff=4500.0, order=order, sample_rate=sample_rate)
+        cutoff = np.linspace(4500.0, 500.0, num_samples)
+        swept = np.concatenate([filter_instance.apply(signal[i:i+chunk_size], cutoff=cutoff[i:i+chunk_size]) for i in range(0, num_samples, chunk_size)])
+        peak = np.max(np.abs(swept))
+        assert peak < 2.0, f"order {order}: cutoff sweep peaks at {peak}"
+        
+    print("Modulated filter OK")
@@ -0,0 +1,30 @@
+# fm_test_cases.py
+
+from components.fm_synth import FMSynth
+
+import numpy as np
+import matplotlib.pyplot as plt
+
+def test_fm(preset='epiano', sample_rate=44100, duration=2.0):
+    synth = FMSynth(num_operators=4, sample_rate=sample_rate)
+    synth.load_preset(preset)
+    
+    num_samples = int(sample_rate * duration)
+    t = np.arange(num_samples) / sample_rate
+    signal = np.zeros(num_samples)
+    
+    chunk_size = 1024
+    synth.note_on(261.63, velocity=1.0)
+    for i in range(0, num_samples, chunk_size):
+        if i >= int(0.5 * duration * sample_rate) and i < int(0.5 * duration * sample_rate) + chunk_size:
+            synth.note_off()
+        end = min(i + chunk_size, num_samples)
+        synth.render(end - i, out=signal[i:end])
+        
+    plt.figure(figsize=(10, 4))
+    plt.plot(t, signal)
+    plt.title(f'FM {preset} Test')
+    plt.xlabel('Time')
+    plt.ylabel('Amplitude')
+    plt.tight_layout()
+    plt.show()
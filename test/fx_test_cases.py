@@ -40,4 +40,34 @@ def test_fx():
     plt.legend()
 
     plt.tight_layout()
-    plt.show()
\ No newline at end of file
+    plt.show()
+def test_fx_tail():
+    sample_rate = 44100
+    chunk_size = 1024
+    num_samples = 3 * sample_rate
+    signal = np.zeros(num_samples)
+    signal[:chunk_size] = Oscillator(waveform='sine', frequency=440, amplitude=1.0).render(chunk_size, sample_rate)
+    
+    def chain():
+        fx = FXProcessor(sample_rate=sample_rate)
+        fx.add_effect('reverb', decay=0.3, room_size=0.5, sample_rate=sample_rate)
+        fx.add_effect('delay', delay_time=0.2, feedback=0.5, mix=0.5, sample_rate=sample_rate)
+        return fx
+        
+    # feedback lines carry the tail across blocks
+    whole = chain().process(signal)
+    fx = chain()
+    blocks = np.concatenate([fx.process(signal[i:i+chunk_size]) for i in range(0, num_samples, chunk_size)])
+    assert np.array_equal(blocks, whole), "block output differs from one-shot output"
+    assert np.max(np.abs(blocks[sample_rate // 2:])) > 0.01, "reverb tail lost after the input stopped"
+    
+    # the chain is bypassed once the tail has decayed
+    silence = np.zeros(chunk_size)
+    for _ in range(2000):
+        if fx.is_silent():
+            break
+        fx.process(silence)
+    assert fx.is_silent(), "reverb tail never decayed below the silence threshold"
+    assert not np.any(fx.process(silence)), "silent chain rendered output"
+    
+    print("FX tail OK")
@@ -28,6 +28,19 @@ def test_mod(mod: str, sample_rate=44100, duration=0.01):
         carrier_freq = 1000.0
         
         modulated_signal = modulator.modulate(carrier_signal=0, modulator_signal=modulator_signal, carrier_frequency=carrier_freq, t=t)
+    elif mod == 'RM':
+        carrier_osc = Oscillator(waveform='sine', frequency=1000.0, amplitude=1.0)
+        modulator_osc = Oscillator(waveform='sine', frequency=100.0, amplitude=1.0)
+        
+        modulator = Modulator(modulation_type='RM', modulation_index=1.0, modulator_range=1.0)
+        
+        chunk_size = 64
+        modulated_signal = np.zeros(len(t))
+        for i in range(0, len(t), chunk_size):
+            end = min(i + chunk_size, len(t))
+            carrier_chunk = carrier_osc.render(end - i, sample_rate)
+            modulator_chunk = modulator_osc.render(end - i, sample_rate)
+            modulator.process(carrier_chunk, modulator_chunk, out=modulated_signal[i:end])
     
     plt.figure(figsize=(10, 4))
     plt.plot(t, modulated_signal)
@@ -36,3 +49,28 @@ def test_mod(mod: str, sample_rate=44100, duration=0.01):
     plt.ylabel('Amplitude')
     plt.tight_layout()
     plt.show()
+    
+def test_mod_blocks(sample_rate=44100, num_samples=4096):
+    carrier_signal = Oscillator(waveform='sine', frequency=1000.0).render(num_samples, sample_rate)
+    modulator_signal = Oscillator(waveform='sine', frequency=100.0).render(num_samples, sample_rate)
+    
+    for mod in ['AM', 'RM']:
+        modulator = Modulator(modulation_type=mod, modulation_index=0.8, modulator_range=1.0)
+        whole = modulator.process(carrier_signal, modulator_signal)
+        
+        # uneven block sizes must give the same result as one block
+        for chunk_size in [1, 64, 1000]:
+            blocks = np.zeros(num_samples)
+            for i in range(0, num_samples, chunk_size):
+                end = min(i + chunk_size, num_samples)
+                modulator.process(carrier_signal[i:end], modulator_signal[i:end], out=blocks[i:end])
+            assert np.array_equal(blocks, whole), f"{mod}: output with {chunk_size}-sample blocks differs"
+            
+        try:
+            modulator.process(carrier_signal[:4], modulator_signal[:4], out=np.zeros(8))
+        except ValueError:
+            pass
+        else:
+            raise AssertionError(f"{mod}: output buffer longer than the carrier was accepted")
+            
+    print("Modulator blocks OK")
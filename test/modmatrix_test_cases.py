@@ -0,0 +1,52 @@
+# modmatrix_test_cases.py
+
+from components.oscillator import Oscillator
+from components.filter import Filter
+from components.envelope_generator import EnvelopeGenerator
+from components.mod_matrix import ModulationMatrix, LFO
+
+import numpy as np
+import matplotlib.pyplot as plt
+
+def test_modmatrix(sample_rate=44100, duration=2.0):
+    osc = Oscillator(waveform='sawtooth', frequency=220.0, amplitude=1.0)
+    filter_instance = Filter(filter_type='lowpass', cutoff=1000.0, order=2, sample_rate=sample_rate)
+    
+    matrix = ModulationMatrix(sample_rate=sample_rate, control_period=32)
+    matrix.add_source('vibrato', LFO(waveform='sine', rate=5.0))
+    matrix.add_source('filter_env', EnvelopeGenerator(attack=0.05, decay=0.5, sustain_level=0.2, release=0.3, sample_rate=matrix.control_rate))
+    matrix.add_destination('pitch', 220.0, minimum=20.0)
+    matrix.add_destination('cutoff', 500.0, minimum=20.0, maximum=0.45 * sample_rate)
+    matrix.add_route('vibrato', 'pitch', 3.0)
+    matrix.add_route('filter_env', 'cutoff', 4000.0)
+    matrix.note_on(57, velocity=1.0)
+    
+    num_samples = int(sample_rate * duration)
+    t = np.arange(num_samples) / sample_rate
+    signal = np.zeros(num_samples)
+    cutoff = np.zeros(num_samples)
+    
+    chunk_size = 1024
+    for i in range(0, num_samples, chunk_size):
+        end = min(i + chunk_size, num_samples)
+        controls = matrix.process(end - i)
+        block = osc.render(end - i, sample_rate, frequency=controls['pitch'])
+        signal[i:end] = filter_instance.apply(block, cutoff=controls['cutoff'], control_period=matrix.control_period)
+        cutoff[i:end] = controls['cutoff']
+        
+    plt.figure(figsize=(10, 6))
+    
+    plt.subplot(2, 1, 1)
+    plt.plot(t, cutoff)
+    plt.title('Modulated Cutoff')
+    plt.xlabel('Time')
+    plt.ylabel('Frequency [Hz]')
+    
+    plt.subplot(2, 1, 2)
+    plt.plot(t, signal)
+    plt.title('Filtered Signal')
+    plt.xlabel('Time')
+    plt.ylabel('Amplitude')
+    
+    plt.tight_layout()
+    plt.show()
@@ -0,0 +1,30 @@
+# noise_test_cases.py
+
+from components.noise import NoiseGenerator
+
+import numpy as np
+import matplotlib.pyplot as plt
+
+def test_noise(sample_rate=44100, duration=2.0):
+    num_samples = int(sample_rate * duration)
+    chunk_size = 1024
+    freqs = np.fft.rfftfreq(num_samples, 1 / sample_rate)
+    
+    plt.figure(figsize=(10, 8))
+    
+    for index, color in enumerate(['white', 'pink', 'brown']):
+        # one stream per voice, rendered in blocks
+        noise = NoiseGenerator(color=color, seed=2024, stream=index)
+        signal = np.zeros(num_samples)
+        for i in range(0, num_samples, chunk_size):
+            end = min(i + chunk_size, num_samples)
+            noise.render(end - i, out=signal[i:end])
+            
+        plt.subplot(3, 1, index + 1)
+        plt.semilogx(freqs[1:], 20 * np.log10(np.abs(np.fft.rfft(signal))[1:] + 1e-9))
+        plt.title(f'{color.capitalize()} Noise Spectrum')
+        plt.xlabel('Frequency [Hz]')
+        plt.ylabel('Magnitude [dB]')
+        
+    plt.tight_layout()
+    plt.show()
@@ -5,3 +5,36 @@ from components.oscillator import Oscillator
 import numpy as np
 import matplotlib.pyplot as plt
 
+
+def test_unison(sample_rate=44100, duration=1.0):
+    num_samples = int(sample_rate * duration)
+    t = np.arange(num_samples) / sample_rate
+    chunk_size = 1024
+    
+    single = Oscillator(waveform='sawtooth', frequency=110.0)
+    supersaw = Oscillator(waveform='sawtooth', frequency=110.0, unison_voices=7, detune=25.0, spread=1.0)
+    
+    signals = []
+    for osc in [single, supersaw]:
+        signal = np.zeros(num_samples)
+        for i in range(0, num_samples, chunk_size):
+            end = min(i + chunk_size, num_samples)
+            osc.render(end - i, sample_rate, out=signal[i:end])
+        signals.append(signal)
+        
+    plt.figure(figsize=(10, 6))
+    
+    plt.subplot(2, 1, 1)
+    plt.plot(t[:2000], signals[0][:2000])
+    plt.title("Sawtooth")
+    plt.xlabel("Time")
+    plt.ylabel("Amplitude")
+    
+    plt.subplot(2, 1, 2)
+    plt.plot(t, signals[1])
+    plt.title("Supersaw (7 Unison Voices)")
+    plt.xlabel("Time")
+    plt.ylabel("Amplitude")
+    
+    plt.tight_layout()
+    plt.show()
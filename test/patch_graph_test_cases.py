@@ -0,0 +1,63 @@
+# patch_graph_test_cases.py
+
+from components.oscillator import Oscillator
+from components.mixer import Mixer
+from components.filter import Filter
+from components.envelope_generator import EnvelopeGenerator
+from components.fxprocessor import FXProcessor
+from components.patch_graph import PatchGraph
+
+import numpy as np
+import matplotlib.pyplot as plt
+
+def test_patch_graph(sample_rate=44100, duration=2.0):
+    graph = PatchGraph(sample_rate=sample_rate, block_size=1024)
+    
+    mixer = Mixer()
+    mixer.add_oscillator(Oscillator(waveform='sine', frequency=261.63), weight=1.0)
+    mixer.add_oscillator(Oscillator(waveform='sine', frequency=523.25), weight=0.5)
+    mixer.add_oscillator(Oscillator(waveform='sawtooth', frequency=261.63), weight=0.2)
+    
+    fx = FXProcessor(sample_rate)
+    fx.add_effect('tremolo', depth=0.5, rate=5.0, sample_rate=sample_rate)
+    
+    graph.add_node('mixer', mixer)
+    graph.add_node('sub', Oscillator(waveform='sine'), key_ratio=0.5)
+    graph.add_sum('bus')
+    graph.add_gain('trim', 0.5)
+    graph.add_node('filter', Filter(filter_type='lowpass', cutoff=1000.0, order=2, sample_rate=sample_rate))
+    graph.add_node('envelope', EnvelopeGenerator(attack=0.01, decay=0.15, sustain_level=0.8, release=0.2, sample_rate=sample_rate))
+    graph.add_gain('vca')
+    graph.add_node('fx', fx)
+    
+    graph.connect('mixer', 'bus')
+    graph.connect('sub', 'bus', gain=0.3)
+    graph.connect('bus', 'trim')
+    graph.connect('trim', 'filter')
+    graph.connect('filter', 'vca')
+    graph.connect('envelope', 'vca', port='gain')
+    graph.connect('vca', 'fx')
+    graph.set_output('fx')
+    graph.compile()
+    
+    print(f'{len(graph.schedule)} steps, {graph.num_buffers} buffers')
+    
+    num_samples = int(sample_rate * duration)
+    t = np.arange(num_samples) / sample_rate
+    signal = np.zeros(num_samples)
+    
+    chunk_size = 1024
+    graph.note_on(261.63)
+    for i in range(0, num_samples, chunk_size):
+        if i >= int(0.5 * duration * sample_rate) and i < int(0.5 * duration * sample_rate) + chunk_size:
+            graph.note_off()
+        end = min(i + chunk_size, num_samples)
+        signal[i:end] = graph.render(end - i)
+        
+    plt.figure(figsize=(10, 4))
+    plt.plot(t, signal)
+    plt.title('Patch Graph Test')
+    plt.xlabel('Time')
+    plt.ylabel('Amplitude')
+    plt.tight_layout()
+    plt.show()
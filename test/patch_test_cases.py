@@ -0,0 +1,55 @@
+# patch_test_cases.py
+
+import os
+import tempfile
+import time
+
+from components.oscillator import Oscillator
+from components.filter import Filter
+from components.envelope_generator import EnvelopeGenerator
+from components.fxprocessor import FXProcessor
+from components.patch import Patch, PatchCache, load_patch, patch_from_dict
+
+import numpy as np
+import matplotlib.pyplot as plt
+
+def test_patch(sample_rate=44100, duration=1.0, num_loads=200):
+    patch = Patch(sample_rate=sample_rate)
+    patch.mixer.add_oscillator(Oscillator(waveform='sawtooth', frequency=110.0, unison_voices=7, detune=25.0, spread=1.0), weight=1.0)
+    patch.mixer.add_oscillator(Oscillator(waveform='sine', frequency=55.0), weight=0.5)
+    patch.filter = Filter(filter_type='lowpass', cutoff=2000.0, order=4, sample_rate=sample_rate)
+    patch.envelope = EnvelopeGenerator(attack=0.2, decay=0.3, sustain_level=0.6, release=0.5, sample_rate=sample_rate, curve='exp')
+    patch.fx = FXProcessor(sample_rate)
+    patch.fx.add_effect('chorus', depth=0.002, rate=0.5, mix=0.3, sample_rate=sample_rate)
+    
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'patch.json')
+        patch.save(path)
+        cache = PatchCache(os.path.join(directory, 'cache'))
+        loaded = load_patch(path, cache=cache)
+        assert np.array_equal(loaded.filter.b, patch.filter.b) and np.array_equal(loaded.filter.a, patch.filter.a), "cached filter differs from its design"
+        
+        # after the first load above everything is compiled and the cache is warm
+        data = patch.to_dict()
+        for label, load_cache in [('uncached', None), ('cached', cache)]:
+            start = time.perf_counter()
+            for _ in range(num_loads):
+                patch_from_dict(data, cache=load_cache)
+            print(f'{label} load: {1000 * (time.perf_counter() - start) / num_loads:.3f} ms')
+            
+    num_samples = int(sample_rate * duration)
+    t = np.arange(num_samples) / sample_rate
+    signal = np.zeros(num_samples)
+    for osc, weight in zip(loaded.mixer.oscillators, loaded.mixer.weights):
+        signal += weight * osc.render(num_samples, sample_rate)
+    signal = loaded.fx.process(loaded.filter.apply(signal))
+    envelope = loaded.envelope.generate(duration + 1 / sample_rate)
+    signal = signal[:len(envelope)] * envelope
+    
+    plt.figure(figsize=(10, 4))
+    plt.plot(t[:len(signal)], signal)
+    plt.title('Loaded Patch')
+    plt.xlabel('Time')
+    plt.ylabel('Amplitude')
+    plt.tight_layout()
+    plt.show()
@@ -0,0 +1,51 @@
+# resampler_test_cases.py
+
+from components.oscillator import Oscillator
+from components.resampler import Resampler, Oversampler
+
+import numpy as np
+import matplotlib.pyplot as plt
+
+def test_resampler(sample_rate=44100, duration=0.5):
+    num_samples = int(sample_rate * duration)
+    chunk_size = 1024
+    
+    # sawtooth, rendered directly and at 4x
+    direct = Oscillator(waveform='sawtooth', frequency=3520.0).render(num_samples, sample_rate)
+    
+    osc = Oscillator(waveform='sawtooth', frequency=3520.0)
+    oversampler = Oversampler(factor=4, sample_rate=sample_rate)
+    oversampled = np.zeros(num_samples)
+    for i in range(0, num_samples, chunk_size):
+        end = min(i + chunk_size, num_samples)
+        block = osc.render((end - i) * oversampler.factor, oversampler.oversampled_rate)
+        oversampled[i:end] = oversampler.downsample(block)
+        
+    # 48k -> 44.1k conversion of the oversampled result
+    resampler = Resampler(input_rate=48000, output_rate=44100)
+    converted = np.concatenate([resampler.process(oversampled[i:i + chunk_size]) for i in range(0, num_samples, chunk_size)])
+    
+    freqs = np.fft.rfftfreq(num_samples, 1 / sample_rate)
+    
+    plt.figure(figsize=(10, 8))
+    
+    plt.subplot(3, 1, 1)
+    plt.plot(freqs, 20 * np.log10(np.abs(np.fft.rfft(direct)) + 1e-9))
+    plt.title('Sawtooth Spectrum')
+    plt.xlabel('Frequency [Hz]')
+    plt.ylabel('Magnitude [dB]')
+    
+    plt.subplot(3, 1, 2)
+    plt.plot(freqs, 20 * np.log10(np.abs(np.fft.rfft(oversampled)) + 1e-9))
+    plt.title('4x Oversampled Sawtooth Spectrum')
+    plt.xlabel('Frequency [Hz]')
+    plt.ylabel('Magnitude [dB]')
+    
+    plt.subplot(3, 1, 3)
+    plt.plot(converted[:2000])
+    plt.title('Resampled 48k -> 44.1k')
+    plt.xlabel('Sample')
+    plt.ylabel('Amplitude')
+    
+    plt.tight_layout()
+    plt.show()